@@ -0,0 +1,39 @@
+"""
+The game of Chess.
+
+The names exported by the package are imported lazily, on first use,
+so that importing the package itself is cheap:
+
+>>> import chess
+>>> chess.Game.new().color
+<Color.White: 1>
+"""
+
+import importlib
+
+_exports = {
+    "Color": "color",
+    "Field": "field",
+    "Figure": "figure",
+    "FigureType": "figure",
+    "Move": "move",
+    "MoveType": "move",
+    "Game": "game",
+    "DrawReason": "game",
+    "Stats": "stats",
+}
+
+__all__ = list(_exports)
+
+
+def __getattr__(name):
+    module_name = _exports.get(name)
+    if module_name is None:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    value = getattr(importlib.import_module("." + module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,348 @@
+import argparse
+import gc
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from . import stats
+from .game import Game
+from .notation import move_to_uci, play_uci
+
+
+def perft(game, depth):
+    """
+    Returns the number of valid move sequences of the given length.
+
+    >>> [perft(Game.new(), depth) for depth in range(3)]
+    [1, 20, 400]
+    """
+    if depth == 0:
+        return 1
+    with stats.timer("movegen"):
+        games = game.next_games()
+    with stats.timer("legality"):
+        games = [g for g in games if not g.is_other_king_under_check()]
+    if depth == 1:
+        return len(games)
+    return sum(perft(g, depth - 1) for g in games)
+
+
+def run_perft(depth, profile=None):
+    """
+    Runs perft from the initial position and returns the summary of the run.
+    If 'profile' is given, the instrumentation is enabled, the run is profiled
+    with cProfile and the profile and the summary are written to
+    the files 'profile'.prof and 'profile'.json.
+    """
+    if profile is not None:
+        import cProfile
+        collected = stats.enable()
+        profiler = cProfile.Profile()
+        profiler.enable()
+    start = time.perf_counter()
+    try:
+        nodes = perft(Game.new(), depth)
+    finally:
+        seconds = time.perf_counter() - start
+        if profile is not None:
+            profiler.disable()
+            stats.disable()
+    summary = {"depth": depth, "nodes": nodes, "seconds": seconds,
+               "nps": nodes / seconds if seconds > 0 else 0.0}
+    if profile is not None:
+        summary["stats"] = collected.as_dict()
+        profiler.dump_stats(profile + ".prof")
+        with open(profile + ".json", "w") as f:
+            json.dump(summary, f, indent=2)
+    return summary
+
+
+# Import statements measured by the import-time benchmark, with their budgets in milliseconds.
+import_time_budgets = {
+    "import chess": 10.0,
+    "from chess import Game": 60.0,
+}
+
+
+def measure_import_time(statement, repeat=5):
+    """
+    Returns the median time, in milliseconds, of executing an import statement
+    in a fresh interpreter, excluding the interpreter startup.
+    """
+    code = ("import time; start = time.perf_counter(); " + statement +
+            "; print(1000 * (time.perf_counter() - start))")
+    env = dict(os.environ)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [root, env.get("PYTHONPATH")]))
+    times = [float(subprocess.run([sys.executable, "-c", code], env=env, check=True,
+                                  capture_output=True, text=True).stdout)
+             for _ in range(repeat)]
+    return statistics.median(times)
+
+
+def run_import_time(budgets=None, repeat=5):
+    """
+    Measures the import times of the statements from 'budgets' (by default
+    'import_time_budgets') and returns a list of (statement, milliseconds,
+    budget) triples.
+    """
+    budgets = import_time_budgets if budgets is None else budgets
+    return [(statement, measure_import_time(statement, repeat), budget)
+            for statement, budget in budgets.items()]
+
+
+def _traced_blocks():
+    return len(tracemalloc.take_snapshot().traces)
+
+
+def _measure(workload):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        start_blocks = _traced_blocks()
+        start_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        nodes, kept = workload()
+        peak_bytes = tracemalloc.get_traced_memory()[1] - start_bytes
+        gc.collect()
+        retained_bytes = tracemalloc.get_traced_memory()[0] - start_bytes
+        retained_objects = _traced_blocks() - start_blocks
+        kept_nothing = kept is None
+        kept = None
+        gc.collect()
+        leaked_bytes = tracemalloc.get_traced_memory()[0] - start_bytes
+        seconds = time.perf_counter() - start
+    finally:
+        tracemalloc.stop()
+    return nodes, kept_nothing, seconds, peak_bytes, retained_bytes, retained_objects, leaked_bytes
+
+
+def measure_memory(workload):
+    """
+    Runs a workload under tracemalloc. The workload returns the number of nodes
+    it visited and the objects it keeps (or None). Returns the peak of the memory
+    allocated during the run, the memory and the number of memory blocks (objects)
+    still allocated for the kept objects, per node (None if nothing is kept),
+    and the memory not released after the kept objects are dropped.
+    The snapshots used to count the blocks are dropped before the memory is read,
+    and what the measurement itself allocates is subtracted, as measured
+    with a workload which allocates nothing.
+
+    >>> result = measure_memory(lambda: (10000, [[] for _ in range(10000)]))
+    >>> result["nodes"], round(result["objects_per_node"], 2), result["bytes_per_node"] > 50
+    (10000, 1.0, True)
+
+    >>> measure_memory(lambda: (1, []))["objects_per_node"]
+    1.0
+
+    >>> result = measure_memory(lambda: (1, None))
+    >>> result["bytes_per_node"], result["objects_per_node"], result["leaked_bytes"]
+    (None, None, 0)
+    """
+    _, _, _, _, own_bytes, own_objects, _ = _measure(lambda: (1, ()))
+    nodes, kept_nothing, seconds, peak_bytes, retained_bytes, retained_objects, leaked_bytes = _measure(workload)
+    retained_bytes -= own_bytes
+    retained_objects -= own_objects
+    return {"nodes": nodes, "seconds": seconds,
+            "peak_bytes": peak_bytes,
+            "peak_bytes_per_node": peak_bytes / nodes if nodes else 0.0,
+            "bytes_per_node": None if kept_nothing or not nodes else retained_bytes / nodes,
+            "objects_per_node": None if kept_nothing or not nodes else retained_objects / nodes,
+            "leaked_bytes": max(leaked_bytes, 0)}
+
+
+def random_game(plies, seed=0):
+    """
+    Returns the moves (in the UCI notation) of a game of random valid moves
+    from the initial position, which has the given number of plies
+    unless it finishes earlier. The same seed gives the same game.
+
+    >>> random_game(4) == random_game(4)
+    True
+    """
+    rng = random.Random(seed)
+    game = Game.new()
+    moves = []
+    while len(moves) < plies and not game.is_game_finished():
+        game = rng.choice(game.valid_games())
+        moves.append(move_to_uci(game.last_move))
+    return moves
+
+
+def _replay(moves):
+    game = Game.new()
+    for move in moves:
+        game = play_uci(game, move)
+    return game
+
+
+def _movegen_workload(positions):
+    def run():
+        children = [game.next_games() for game in positions]
+        return sum(map(len, children)), children
+    return run
+
+
+def _make_workload(positions):
+    moves = [(game, [g.last_move for g in game.valid_games()]) for game in positions]
+
+    def run():
+        children = [game.updated(move) for game, game_moves in moves for move in game_moves]
+        return len(children), children
+    return run
+
+
+def _perft_workload(depth):
+    def run():
+        return perft(Game.new(), depth), None
+    return run
+
+
+def measure_perft_memory(depth):
+    """
+    Measures the memory of perft (see 'measure_memory'). Perft keeps nothing,
+    so its objects per node are the games and board copies it creates per node,
+    counted by the instrumentation in a separate run, which does not disturb
+    the memory measurement.
+
+    >>> result = measure_perft_memory(2)
+    >>> result["nodes"], result["games_per_node"], result["board_copies_per_node"]
+    (400, 1.0525, 1.05)
+    """
+    collected = stats.enable()
+    try:
+        nodes = perft(Game.new(), depth)
+    finally:
+        stats.disable()
+    games = collected.counters.get("games", 0)
+    board_copies = collected.counters.get("board_copies", 0)
+    result = measure_memory(_perft_workload(depth))
+    result.update(games_per_node=games / nodes, board_copies_per_node=board_copies / nodes,
+                  objects_per_node=(games + board_copies) / nodes)
+    return result
+
+
+def _replay_workload(moves):
+    def run():
+        return len(moves), _replay(moves)
+    return run
+
+
+def run_memory(depths=(3,), plies=300, positions=50, seed=0):
+    """
+    Runs the memory benchmarks and returns their results by name:
+    'movegen' generates the next games of sample positions, 'make' makes
+    every valid move of the positions and then drops the new games (the games
+    are immutable, so dropping them is the unmake), 'perft(N)' counts the move
+    sequences of each of the given depths, and 'replay' replays a long game of random
+    moves, keeping the final game with its history. The sample positions
+    are the first positions of that game.
+    """
+    moves = random_game(plies, seed)
+    game = Game.new()
+    sample = [game]
+    for move in moves[:positions - 1]:
+        game = play_uci(game, move)
+        sample.append(game)
+    results = {"movegen": measure_memory(_movegen_workload(sample)),
+               "make": measure_memory(_make_workload(sample))}
+    for depth in depths:
+        results["perft({})".format(depth)] = measure_perft_memory(depth)
+    results["replay"] = measure_memory(_replay_workload(moves))
+    return results
+
+
+# Metrics of the memory benchmarks checked against the baseline.
+memory_metrics = ["peak_bytes", "bytes_per_node", "objects_per_node", "leaked_bytes"]
+
+
+def compare_memory(results, baseline, threshold=0.1):
+    """
+    Compares the results of the memory benchmarks with a baseline and
+    returns a list of regressions: the metrics which grew by more than
+    the given fraction of their baseline values.
+
+    >>> compare_memory({"perft": {"peak_bytes": 1300}}, {"perft": {"peak_bytes": 1000}}, 0.2)
+    ['perft peak_bytes grew by 30.0% (1300, baseline 1000, threshold 20.0%)']
+
+    >>> compare_memory({"perft": {"peak_bytes": 1100}}, {"perft": {"peak_bytes": 1000}}, 0.2)
+    []
+    """
+    regressions = []
+    for name, result in results.items():
+        for metric in memory_metrics:
+            value = result.get(metric)
+            base = baseline.get(name, {}).get(metric)
+            if value is None or base is None:
+                continue
+            if (value > base * (1 + threshold)) if base else value > 0:
+                regressions.append("{} {} grew by {} ({:.6g}, baseline {:.6g}, threshold {:.1f}%)".format(
+                    name, metric, "{:.1f}%".format(100 * (value / base - 1)) if base else "from 0",
+                    value, base, 100 * threshold))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Chess benchmarks.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    perft_parser = commands.add_parser("perft", help="count move sequences from the initial position")
+    perft_parser.add_argument("--depth", type=int, default=3)
+    perft_parser.add_argument("--profile", metavar="PREFIX",
+                              help="collect stats and write PREFIX.prof (cProfile) and PREFIX.json (summary)")
+    import_parser = commands.add_parser("import-time", help="check import times against their budgets")
+    import_parser.add_argument("--repeat", type=int, default=5)
+    import_parser.add_argument("--scale", type=float, default=1.0,
+                               help="multiply the budgets, e.g. on slow machines")
+    memory_parser = commands.add_parser("memory", help="measure memory allocated per node with tracemalloc")
+    memory_parser.add_argument("--depth", type=int, nargs="+", default=[3], help="perft depths")
+    memory_parser.add_argument("--plies", type=int, default=300, help="length of the replayed game")
+    memory_parser.add_argument("--positions", type=int, default=50, help="sample positions for movegen and make")
+    memory_parser.add_argument("--seed", type=int, default=0, help="seed of the random game")
+    memory_parser.add_argument("--save-baseline", metavar="FILE", help="write the results as JSON to FILE")
+    memory_parser.add_argument("--baseline", metavar="FILE", help="fail if the memory use grew compared to FILE")
+    memory_parser.add_argument("--threshold", type=float, default=0.1,
+                               help="allowed growth, as a fraction of the baseline (default 0.1)")
+    args = parser.parse_args(argv)
+    if args.command == "perft":
+        summary = run_perft(args.depth, args.profile)
+        print("perft({depth}) = {nodes}  {seconds:.3f}s  {nps:.0f} nodes/s".format(**summary))
+        if args.profile is not None:
+            print("profile written to {0}.prof, summary to {0}.json".format(args.profile))
+    elif args.command == "import-time":
+        budgets = {statement: budget * args.scale for statement, budget in import_time_budgets.items()}
+        failed = False
+        for statement, ms, budget in run_import_time(budgets, args.repeat):
+            over = ms > budget
+            failed = failed or over
+            print("{:<30} {:8.2f}ms  budget {:8.2f}ms  {}".format(statement, ms, budget, "OVER" if over else "ok"))
+        return 1 if failed else 0
+    elif args.command == "memory":
+        results = run_memory(args.depth, args.plies, args.positions, args.seed)
+        print("{:<9} {:>8} {:>12} {:>12} {:>10} {:>12} {:>8}".format(
+            "", "nodes", "peak", "peak/node", "bytes/node", "objects/node", "leaked"))
+        for name, r in results.items():
+            print("{:<9} {:>8} {:>12} {:>12.0f} {:>10} {:>12} {:>8}".format(
+                name, r["nodes"], r["peak_bytes"], r["peak_bytes_per_node"],
+                "-" if r["bytes_per_node"] is None else "{:.0f}".format(r["bytes_per_node"]),
+                "-" if r["objects_per_node"] is None else "{:.1f}".format(r["objects_per_node"]),
+                r["leaked_bytes"]))
+        if args.save_baseline:
+            with open(args.save_baseline, "w") as f:
+                json.dump(results, f, indent=2)
+        if args.baseline:
+            with open(args.baseline) as f:
+                regressions = compare_memory(results, json.load(f), args.threshold)
+            for regression in regressions:
+                print("REGRESSION: " + regression, file=sys.stderr)
+            if regressions:
+                return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,9 @@
-from color import Color
-from figure import Figure, FigureType
-from field import Field
-from move import Move, MoveType
+from .color import Color
+from .figure import Figure, FigureType
+from .field import Field
+from .move import Move, MoveType
+from .render import board_diagram
+from . import stats
 
 def starting_board():
     return {
@@ -55,11 +57,7 @@ def show_board(board):
     1rnbqkbnr1
      abcdefgh
     """
-    def row_to_str(row):
-        return "".join([str(board.get((col,row), ".")) for col in range(1,9)])
-    return (" abcdefgh\n" +
-            "".join([ (str(row) + row_to_str(row) + str(row) + "\n") for row in range(8,0,-1)]) +
-            " abcdefgh")
+    return board_diagram(board)
 
 
 def update_board(board, move):
@@ -126,6 +124,8 @@ def update_board(board, move):
     1.nkr.bnr1
      abcdefgh
     """
+    if stats.active is not None:
+        stats.active.count("board_copies")
     from_key = (move.frm.col, move.frm.row)
     to_key = (move.to.col, move.to.row)
     if move.type == MoveType.RegularMove:
@@ -168,6 +168,63 @@ def update_board(board, move):
             return board.copy()
 
 
+def board_changes(board, move):
+    """
+    Returns the figures removed from the board and the figures added to it
+    by a move, as two lists of (field key, figure) pairs.
+    The changes are consistent with the board returned by 'update_board'.
+
+    >>> board_changes(starting_board(), Move(MoveType.RegularMove, Field(2,2), Field(2,3)))
+    ([((2, 2), p)], [((2, 3), p)])
+
+    >>> board_changes(starting_board(), Move(MoveType.RegularMove, Field(2,1), Field(2,7)))
+    ([((2, 1), n), ((2, 7), P)], [((2, 7), n)])
+
+    >>> board_changes(starting_board(), Move(MoveType.RegularMove, Field(3,3), Field(2,3)))
+    ([], [])
+    """
+    from_key = (move.frm.col, move.frm.row)
+    to_key = (move.to.col, move.to.row)
+    if move.type == MoveType.CastlingMove:
+        rook_from_key = (move.data['rook_from'].col, move.data['rook_from'].row)
+        if (from_key in board and rook_from_key in board):
+            rook_to_key = (move.data['rook_to'].col, move.data['rook_to'].row)
+            return ([(from_key, board[from_key]), (rook_from_key, board[rook_from_key])],
+                    [(to_key, board[from_key]), (rook_to_key, board[rook_from_key])])
+        else:
+            return [], []
+    if not (from_key in board):
+        return [], []
+    removed = [(from_key, board[from_key])]
+    if to_key in board:
+        removed.append((to_key, board[to_key]))
+    if move.type == MoveType.EnPassantMove:
+        captured_key = (move.data['captured'].col, move.data['captured'].row)
+        removed.append((captured_key, board[captured_key]))
+    if move.type == MoveType.PromotionMove:
+        return removed, [(to_key, move.data['figure'])]
+    else:
+        return removed, [(to_key, board[from_key])]
+
+
+def figure_counts(board):
+    """
+    Returns the numbers of figures on the board,
+    keyed by (figure type, figure color) pairs.
+
+    >>> figure_counts(starting_board())[(FigureType.Pawn, Color.Black)]
+    8
+
+    >>> figure_counts(starting_board())[(FigureType.King, Color.White)]
+    1
+    """
+    counts = {}
+    for figure in board.values():
+        key = (figure.figure_type, figure.figure_color)
+        counts[key] = counts.get(key, 0) + 1
+    return counts
+
+
 if __name__ == "__main__":
     import doctest
     doctest.testmod()
@@ -0,0 +1,203 @@
+import argparse
+import json
+import shlex
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from .fen import game_from_fen
+from .notation import move_to_uci, play_san
+from .search import Search
+
+
+class EpdPosition:
+    """
+    A test position of an EPD suite: the position in the FEN notation
+    and the operations, such as 'bm' (best moves), 'am' (avoid moves) or 'id'.
+
+    >>> p = EpdPosition.parse('6k1/5ppp/8/8/8/8/8/R5K1 w - - bm Ra8#; id "back rank";')
+    >>> p.fen, p.operations
+    ('6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1', {'bm': ['Ra8#'], 'id': ['back rank']})
+    >>> p.id
+    'back rank'
+    """
+
+    def __init__(self, fen, operations):
+        self.fen = fen
+        self.operations = operations
+
+    @property
+    def id(self):
+        return self.operations.get("id", [None])[0]
+
+    @staticmethod
+    def parse(line):
+        fields = line.split(None, 4)
+        if len(fields) < 4:
+            raise ValueError("invalid EPD: {!r}".format(line))
+        operations = {}
+        for operation in (fields[4] if len(fields) > 4 else "").split(";"):
+            tokens = shlex.split(operation)
+            if tokens:
+                operations[tokens[0]] = tokens[1:]
+        halfmove_clock = operations.get("hmvc", ["0"])[0]
+        fullmove_number = operations.get("fmvn", ["1"])[0]
+        return EpdPosition(" ".join(fields[:4] + [halfmove_clock, fullmove_number]), operations)
+
+
+def load_suite(path):
+    """
+    Returns the positions of an EPD file, skipping empty lines and comments.
+    """
+    with open(path) as f:
+        return [EpdPosition.parse(line) for line in f if line.strip() and not line.startswith("#")]
+
+
+def _uci_moves(game, operations, name):
+    moves = set()
+    for san in operations.get(name, []):
+        next_game = play_san(game, san)
+        if next_game is None:
+            raise ValueError("invalid {} move: {}".format(name, san))
+        moves.add(move_to_uci(next_game.last_move))
+    return moves
+
+
+def solve(position, nodes=None, movetime=None, max_depth=64):
+    """
+    Searches an EPD position and returns the result: whether the chosen move
+    is one of the best moves ('bm') and none of the moves to avoid ('am'),
+    the time after which the search kept choosing a correct move,
+    and the search statistics. The nodes include those of the last,
+    interrupted iteration, like the time does.
+    Positions which are not supported, such as those with castling moves
+    among the best moves, are not searched: the reason is returned as 'skipped'.
+
+    >>> result = solve(EpdPosition.parse('6k1/5ppp/8/8/8/8/8/R5K1 w - - bm Ra8#;'), max_depth=3)
+    >>> result['move'], result['solved'], result['depth'], result['skipped']
+    ('a1a8', True, 2, None)
+
+    >>> solve(EpdPosition.parse('4k3/8/8/8/8/8/8/4K2R w K - bm O-O;'), max_depth=3)['skipped']
+    'invalid bm move: O-O'
+    """
+    try:
+        game = game_from_fen(position.fen)
+        best = _uci_moves(game, position.operations, "bm")
+        avoid = _uci_moves(game, position.operations, "am")
+    except ValueError as e:
+        return {"id": position.id, "fen": position.fen, "move": None, "score": None,
+                "depth": 0, "nodes": 0, "seconds": 0.0, "solved": False,
+                "solution_seconds": None, "skipped": str(e)}
+
+    def is_correct(move):
+        return (not best or move in best) and move not in avoid
+
+    solved_at = [None]
+
+    def on_iteration(result):
+        if is_correct(result.move):
+            if solved_at[0] is None:
+                solved_at[0] = result.seconds
+        else:
+            solved_at[0] = None
+
+    search = Search(max_depth=max_depth, nodes=nodes, movetime=movetime)
+    start = time.perf_counter()
+    result = search.run(game, on_iteration)
+    seconds = time.perf_counter() - start
+    solved = result.move is not None and is_correct(result.move)
+    return {"id": position.id, "fen": position.fen, "move": result.move, "score": result.score,
+            "depth": result.depth, "nodes": search.nodes, "seconds": seconds, "solved": solved,
+            "solution_seconds": solved_at[0] if solved else None, "skipped": None}
+
+
+def _solve_task(task):
+    return solve(*task)
+
+
+def run_suite(positions, nodes=None, movetime=None, max_depth=64, workers=0):
+    """
+    Searches all positions of a suite, in a pool of worker processes unless
+    'workers' is 0, and returns the summary: the numbers of solved and skipped positions,
+    the total search time and nodes, the throughput (nodes per second of search,
+    which does not depend on the number of workers) and the results of the positions.
+    """
+    tasks = [(position, nodes, movetime, max_depth) for position in positions]
+    start = time.perf_counter()
+    if workers == 0:
+        results = list(map(_solve_task, tasks))
+    else:
+        with ProcessPoolExecutor(workers) as executor:
+            results = list(executor.map(_solve_task, tasks))
+    wall_seconds = time.perf_counter() - start
+    total_nodes = sum(r["nodes"] for r in results)
+    total_seconds = sum(r["seconds"] for r in results)
+    return {"positions": len(results),
+            "solved": sum(1 for r in results if r["solved"]),
+            "skipped": sum(1 for r in results if r["skipped"]),
+            "nodes": total_nodes,
+            "seconds": total_seconds,
+            "wall_seconds": wall_seconds,
+            "nps": total_nodes / total_seconds if total_seconds > 0 else 0.0,
+            "solution_seconds": sum(r["solution_seconds"] for r in results if r["solved"]),
+            "limits": {"nodes": nodes, "movetime": movetime, "max_depth": max_depth},
+            "results": results}
+
+
+def compare_to_baseline(summary, baseline, threshold=0.1):
+    """
+    Compares the throughput of a run with a baseline run and returns
+    a list of regressions: empty if the throughput did not drop
+    by more than the given fraction.
+
+    >>> compare_to_baseline({"nps": 850.0}, {"nps": 1000.0}, 0.1)
+    ['throughput dropped by 15.0% (850 nps, baseline 1000 nps, threshold 10.0%)']
+
+    >>> compare_to_baseline({"nps": 950.0}, {"nps": 1000.0}, 0.1)
+    []
+    """
+    regressions = []
+    if baseline.get("nps") and summary["nps"] < baseline["nps"] * (1 - threshold):
+        regressions.append("throughput dropped by {:.1f}% ({:.0f} nps, baseline {:.0f} nps, threshold {:.1f}%)".format(
+            100 * (1 - summary["nps"] / baseline["nps"]), summary["nps"], baseline["nps"], 100 * threshold))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Runs the search on an EPD test suite.")
+    parser.add_argument("suite", help="EPD file with 'bm' and/or 'am' operations")
+    parser.add_argument("--nodes", type=int, help="node limit per position")
+    parser.add_argument("--movetime", type=float, help="time limit per position, in seconds")
+    parser.add_argument("--depth", type=int, help="depth limit per position (default 64)")
+    parser.add_argument("--workers", type=int, default=0, help="worker processes (0 searches in this process)")
+    parser.add_argument("--save-baseline", metavar="FILE", help="write the results as JSON to FILE")
+    parser.add_argument("--baseline", metavar="FILE", help="fail if the throughput dropped compared to FILE")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="allowed throughput drop, as a fraction of the baseline (default 0.1)")
+    args = parser.parse_args(argv)
+    if args.nodes is None and args.movetime is None and args.depth is None:
+        parser.error("one of --nodes, --movetime or --depth is needed")
+    depth = 64 if args.depth is None else args.depth
+    summary = run_suite(load_suite(args.suite), args.nodes, args.movetime, depth, args.workers)
+    for r in summary["results"]:
+        if r["skipped"]:
+            print("{:<20} skipped: {}".format(str(r["id"]), r["skipped"]))
+            continue
+        print("{:<20} {:<6} {:<7} depth {:>2} nodes {:>8} {:.2f}s".format(
+            str(r["id"]), str(r["move"]), "solved" if r["solved"] else "-", r["depth"], r["nodes"], r["seconds"]))
+    print("solved {solved}/{positions}  skipped {skipped}  nodes {nodes}  search time {seconds:.2f}s  "
+          "time to solutions {solution_seconds:.2f}s  {nps:.0f} nps".format(**summary))
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(summary, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_to_baseline(summary, json.load(f), args.threshold)
+        for regression in regressions:
+            print("REGRESSION: " + regression, file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+from .color import Color
+from .figure import FigureType, figure_values
+
+# Pawn structure bonuses and penalties, in centipawns.
+# Passed Pawns are rewarded by the number of rows they have advanced.
+passed_pawn_bonus = [0, 0, 10, 15, 25, 40, 65, 100, 0]
+isolated_pawn_penalty = 15
+doubled_pawn_penalty = 10
+
+
+def material(game, color):
+    """
+    Returns the material of the player of the given color, in centipawns,
+    not counting the King.
+
+    >>> from chess.game import Game
+    >>> material(Game.new(), Color.White)
+    4000
+    """
+    return sum(figure_values[figure_type] * count
+               for (figure_type, figure_color), count in game.counts.items()
+               if figure_color == color and figure_type != FigureType.King)
+
+
+def pawn_structure(board):
+    """
+    Evaluates the Pawn structure of a board: passed, isolated and doubled Pawns.
+    Returns the score (in centipawns, from the point of view of the White player)
+    and the bitmasks of the fields of the passed White and Black Pawns.
+
+    >>> from chess.fen import game_from_fen
+    >>> from chess.field import fields_from_mask
+    >>> score, white_passed, black_passed = pawn_structure(game_from_fen('4k3/8/8/3P4/8/6p1/P5p1/4K3 w - - 0 1').board)
+    >>> score, fields_from_mask(white_passed), fields_from_mask(black_passed)
+    (-105, [a2, d5], [g2, g3])
+    """
+    pawns = {Color.White: [], Color.Black: []}
+    for (col, row), figure in board.items():
+        if figure.figure_type == FigureType.Pawn:
+            pawns[figure.figure_color].append((col, row))
+    score = 0
+    passed = {Color.White: 0, Color.Black: 0}
+    for color, sign in ((Color.White, 1), (Color.Black, -1)):
+        own_files = {}
+        for col, row in pawns[color]:
+            own_files[col] = own_files.get(col, 0) + 1
+        enemies = pawns[color.other()]
+        for col, row in pawns[color]:
+            if not any(abs(c - col) <= 1 and (r - row) * sign > 0 for c, r in enemies):
+                passed[color] |= 1 << ((row-1)*8 + col-1)
+                score += sign * passed_pawn_bonus[row if color == Color.White else 9 - row]
+            if (col - 1) not in own_files and (col + 1) not in own_files:
+                score -= sign * isolated_pawn_penalty
+        score -= sign * doubled_pawn_penalty * sum(count - 1 for count in own_files.values())
+    return score, passed[Color.White], passed[Color.Black]
+
+
+class PawnHashTable:
+    """
+    A fixed-size cache of Pawn structure evaluations, indexed by
+    the Pawn structure keys of games ('Game.pawn_key'). Pawn structures
+    rarely change between the positions visited by a search, so most
+    evaluations are found in the table. A new entry replaces the old one
+    stored at the same index.
+
+    >>> from chess.game import Game
+    >>> table = PawnHashTable(1024)
+    >>> table.probe(Game.new()) == table.probe(Game.new()) == (0, 0, 0)
+    True
+    >>> table.hits, table.misses, table.hit_rate()
+    (1, 1, 0.5)
+    """
+
+    def __init__(self, size=1 << 14):
+        if size & (size - 1):
+            raise ValueError("the size of the pawn hash table must be a power of two")
+        self.mask = size - 1
+        self.keys = [None] * size
+        self.entries = [None] * size
+        self.hits = 0
+        self.misses = 0
+
+    def probe(self, game):
+        """
+        Returns the Pawn structure evaluation of a game, as returned by 'pawn_structure'.
+        """
+        key = game.pawn_key
+        index = key & self.mask
+        if self.keys[index] == key:
+            self.hits += 1
+            return self.entries[index]
+        self.misses += 1
+        entry = pawn_structure(game.board)
+        self.keys[index] = key
+        self.entries[index] = entry
+        return entry
+
+    def hit_rate(self):
+        probes = self.hits + self.misses
+        return self.hits / probes if probes else 0.0
+
+    def clear(self):
+        self.keys = [None] * len(self.keys)
+        self.entries = [None] * len(self.entries)
+        self.hits = 0
+        self.misses = 0
+
+
+# The pawn hash table used by 'evaluate' unless another one is given.
+pawn_hash_table = PawnHashTable()
+
+
+def evaluate(game, pawn_table=None):
+    """
+    Returns the static evaluation of a game position, in centipawns,
+    from the point of view of the player who is about to make a move:
+    the material balance and the Pawn structure, which is looked up
+    in 'pawn_table' (by default the module 'pawn_hash_table').
+
+    >>> from chess.game import Game
+    >>> evaluate(Game.new())
+    0
+    """
+    table = pawn_hash_table if pawn_table is None else pawn_table
+    pawns = table.probe(game)[0]
+    if game.color == Color.Black:
+        pawns = -pawns
+    return material(game, game.color) - material(game, game.color.other()) + pawns
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,293 @@
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from .color import Color
+from .fen import game_from_fen, starting_fen
+from .figure import FigureType, figure_values
+from .notation import move_from_uci
+
+# The columns of the extracted features, in order.
+feature_names = [
+    "side_to_move",      # 0 for White, 1 for Black
+    "ply",
+    "halfmove_clock",
+    "material_white",
+    "material_black",
+    "mobility_white",
+    "mobility_black",
+    "attacked_by_white",
+    "attacked_by_black",
+    "king_zone_attacks_white",   # fields around the White King attacked by Black
+    "king_zone_attacks_black",   # fields around the Black King attacked by White
+    "phase",             # 24 in the opening, 0 with Kings and Pawns only
+]
+
+_figures = [(figure_type, color) for color in Color for figure_type in FigureType]
+
+_phase_weights = {FigureType.Queen: 4, FigureType.Rook: 2, FigureType.Bishop: 1, FigureType.Knight: 1}
+
+
+def _square(col, row):
+    return (row-1)*8 + col-1
+
+
+def _targets(col, row, steps):
+    return [_square(col + c, row + r) for c, r in steps
+            if 1 <= col + c <= 8 and 1 <= row + r <= 8]
+
+
+def _ray(col, row, c, r):
+    ray = []
+    col, row = col + c, row + r
+    while 1 <= col <= 8 and 1 <= row <= 8:
+        ray.append(_square(col, row))
+        col, row = col + c, row + r
+    return ray
+
+
+_keys = [(i % 8 + 1, i // 8 + 1) for i in range(64)]
+_knight_targets = [_targets(col, row, [(1,2),(2,1),(-1,2),(2,-1),(-1,-2),(-2,-1),(1,-2),(-2,1)]) for col, row in _keys]
+_king_targets = [_targets(col, row, [(0,1),(0,-1),(1,0),(-1,0),(1,1),(-1,-1),(1,-1),(-1,1)]) for col, row in _keys]
+_pawn_targets = {
+    Color.White: [_targets(col, row, [(-1,1),(1,1)]) for col, row in _keys],
+    Color.Black: [_targets(col, row, [(-1,-1),(1,-1)]) for col, row in _keys],
+}
+_orthogonal_rays = [[_ray(col, row, c, r) for c, r in [(1,0),(-1,0),(0,1),(0,-1)]] for col, row in _keys]
+_diagonal_rays = [[_ray(col, row, c, r) for c, r in [(1,1),(-1,1),(1,-1),(-1,-1)]] for col, row in _keys]
+_king_zones = [sum(1 << t for t in _king_targets[i]) | (1 << i) for i in range(64)]
+
+
+def _attack_maps(board):
+    """
+    Returns, for both colors, the bitmask of the fields attacked by the figures
+    of the color, the number of their moves onto fields not occupied by
+    figures of the same color (not checking whether they leave the King in check),
+    and the bitmask of the fields around their King.
+    This walks precomputed tables of field numbers instead of creating fields.
+
+    >>> from chess.board import starting_board
+    >>> maps = _attack_maps(starting_board())
+    >>> maps[Color.White][1], bin(maps[Color.White][0]).count("1")
+    (20, 22)
+    """
+    occupied = {}
+    for (col, row), figure in board.items():
+        occupied[(row-1)*8 + col-1] = figure
+    maps = {}
+    for color in Color:
+        attacked = 0
+        mobility = 0
+        king_zone = 0
+        for square, figure in occupied.items():
+            if figure.figure_color != color:
+                continue
+            figure_type = figure.figure_type
+            if figure_type == FigureType.Pawn:
+                for t in _pawn_targets[color][square]:
+                    attacked |= 1 << t
+                    target = occupied.get(t)
+                    if target is not None and target.figure_color != color:
+                        mobility += 1
+                step = 8 if color == Color.White else -8
+                if 0 <= square + step < 64 and square + step not in occupied:
+                    mobility += 1
+                    if square // 8 == (1 if color == Color.White else 6) and square + 2*step not in occupied:
+                        mobility += 1
+                continue
+            if figure_type == FigureType.Knight:
+                targets = _knight_targets[square]
+            elif figure_type == FigureType.King:
+                targets = _king_targets[square]
+                king_zone = _king_zones[square]
+            else:
+                targets = []
+                rays = []
+                if figure_type != FigureType.Bishop:
+                    rays += _orthogonal_rays[square]
+                if figure_type != FigureType.Rook:
+                    rays += _diagonal_rays[square]
+                for ray in rays:
+                    for t in ray:
+                        targets.append(t)
+                        if t in occupied:
+                            break
+            for t in targets:
+                attacked |= 1 << t
+                target = occupied.get(t)
+                if target is None or target.figure_color != color:
+                    mobility += 1
+        maps[color] = (attacked, mobility, king_zone)
+    return maps
+
+
+def position_record(game, ply):
+    """
+    Returns the raw per-position data from which the features are computed
+    in batches: the side to move, the ply, the half move clock, the numbers of
+    figures (in the '_figures' order) and the attack maps.
+
+    >>> from chess.game import Game
+    >>> record = position_record(Game.new(), 0)
+    >>> record[0], record[1][:6], record[2]
+    ((0, 0, 0), [1, 1, 2, 2, 2, 8], (20, 20, 22, 22, 0, 0))
+    """
+    maps = _attack_maps(game.board)
+    white_attacks, white_mobility, white_king_zone = maps[Color.White]
+    black_attacks, black_mobility, black_king_zone = maps[Color.Black]
+    return ((0 if game.color == Color.White else 1, ply, game.halfmove_clock),
+            [game.counts.get(figure, 0) for figure in _figures],
+            (white_mobility, black_mobility,
+             bin(white_attacks).count("1"), bin(black_attacks).count("1"),
+             bin(black_attacks & white_king_zone).count("1"), bin(white_attacks & black_king_zone).count("1")))
+
+
+def parse_game_line(line):
+    """
+    Returns the starting position and the moves of a game given on one line:
+    moves in the UCI notation, optionally preceded by a FEN position and a semicolon.
+
+    >>> parse_game_line('e2e4 e7e5')
+    ('rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w - - 0 1', ['e2e4', 'e7e5'])
+
+    >>> parse_game_line('4k3/8/8/8/8/8/4P3/4K3 w - - 0 1; e2e4')
+    ('4k3/8/8/8/8/8/4P3/4K3 w - - 0 1', ['e2e4'])
+    """
+    if ";" in line:
+        fen, moves = line.split(";", 1)
+        return fen.strip(), moves.split()
+    return starting_fen, line.split()
+
+
+def replay(path):
+    """
+    Replays the games of a shard file (one game per line, see 'parse_game_line')
+    and yields the position records of all their positions.
+    The moves are applied directly, generating only the destinations
+    of the moving figures instead of all the next games of the positions.
+    Invalid moves raise ValueError.
+    """
+    with open(path) as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip() or line.startswith("#"):
+                continue
+            fen, moves = parse_game_line(line)
+            game = game_from_fen(fen)
+            yield position_record(game, 0)
+            for ply, text in enumerate(moves, 1):
+                try:
+                    move = move_from_uci(game, text)
+                except ValueError:
+                    move = None
+                game = game.updated(move) if move is not None else None
+                if game is None or game.is_other_king_under_check():
+                    raise ValueError("{}:{}: invalid move {}".format(path, number, text))
+                yield position_record(game, ply)
+
+
+def features_batch(records):
+    """
+    Computes the features (the 'feature_names' columns) of a batch of
+    position records, returning a two-dimensional NumPy array of int32.
+    """
+    import numpy as np
+    batch = len(records)
+    base = np.array([r[0] for r in records], dtype=np.int32).reshape(batch, 3)
+    counts = np.array([r[1] for r in records], dtype=np.int32).reshape(batch, len(_figures))
+    attacks = np.array([r[2] for r in records], dtype=np.int32).reshape(batch, 6)
+    values = np.array([figure_values[figure_type] if figure_type != FigureType.King else 0
+                       for figure_type, _ in _figures], dtype=np.int32)
+    white = np.array([color == Color.White for _, color in _figures])
+    material_white = counts[:, white] @ values[white]
+    material_black = counts[:, ~white] @ values[~white]
+    phase = np.minimum(counts @ np.array([_phase_weights.get(figure_type, 0) for figure_type, _ in _figures],
+                                         dtype=np.int32), 24)
+    return np.column_stack([base, material_white, material_black, attacks, phase]).astype(np.int32)
+
+
+class ChunkWriter:
+    """
+    Writes batches of features to files: every batch to a separate
+    '.npy' or '.npz' file, or all batches appended to one '.csv' file.
+    """
+
+    def __init__(self, prefix, format="npz"):
+        if format not in ("npy", "npz", "csv"):
+            raise ValueError("unknown output format: {!r}".format(format))
+        self.prefix = prefix
+        self.format = format
+        self.chunks = 0
+        self.rows = 0
+
+    def write(self, features):
+        import numpy as np
+        if self.format == "csv":
+            path = self.prefix + ".csv"
+            with open(path, "a" if self.chunks else "w") as f:
+                np.savetxt(f, features, fmt="%d", delimiter=",",
+                           header="" if self.chunks else ",".join(feature_names), comments="")
+        else:
+            path = "{}.{:05d}.{}".format(self.prefix, self.chunks, self.format)
+            if self.format == "npy":
+                np.save(path, features)
+            else:
+                np.savez_compressed(path, features=features, names=np.array(feature_names))
+        self.chunks += 1
+        self.rows += len(features)
+
+
+def extract_shard(path, out_dir, format="npz", batch_size=65536):
+    """
+    Extracts the features of all the positions of the games of a shard
+    and writes them in chunks of at most 'batch_size' rows to files named
+    after the shard in 'out_dir'. At most one batch of records is kept in memory.
+    Returns the number of positions.
+    """
+    name = os.path.splitext(os.path.basename(path))[0]
+    writer = ChunkWriter(os.path.join(out_dir, name), format)
+    records = []
+    for record in replay(path):
+        records.append(record)
+        if len(records) >= batch_size:
+            writer.write(features_batch(records))
+            records = []
+    if records:
+        writer.write(features_batch(records))
+    return writer.rows
+
+
+def _extract_task(task):
+    return extract_shard(*task)
+
+
+def extract(shards, out_dir, format="npz", batch_size=65536, workers=None):
+    """
+    Extracts the features of many shards in a pool of worker processes
+    (or in the current process if 'workers' is 0), one shard per task.
+    Returns the numbers of positions of the shards.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    tasks = [(path, out_dir, format, batch_size) for path in shards]
+    if workers == 0:
+        return list(map(_extract_task, tasks))
+    with ProcessPoolExecutor(workers) as executor:
+        return list(executor.map(_extract_task, tasks))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extracts position features of games to columnar files. Requires NumPy.")
+    parser.add_argument("shards", nargs="+", help="files with one game per line: [FEN;] UCI moves")
+    parser.add_argument("--out", required=True, metavar="DIR", help="output directory")
+    parser.add_argument("--format", choices=["npz", "npy", "csv"], default="npz")
+    parser.add_argument("--batch", type=int, default=65536, help="positions per batch (and per output chunk)")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+    rows = extract(args.shards, args.out, args.format, args.batch, args.workers)
+    for path, n in zip(args.shards, rows):
+        print("{}: {} positions".format(path, n))
+    print("total: {} positions".format(sum(rows)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+from .color import Color
+from .field import Field
+from .figure import Figure, FigureType
+from .game import Game
+from .move import Move, MoveType
+from .render import board_placement
+
+_fen_letters = {
+    FigureType.King: "k",
+    FigureType.Queen: "q",
+    FigureType.Rook: "r",
+    FigureType.Bishop: "b",
+    FigureType.Knight: "n",
+    FigureType.Pawn: "p",
+}
+
+# FEN uses upper case letters for the White figures and lower case letters
+# for the Black ones, which is the opposite of how 'Figure.__str__' shows them.
+fen_figures = {
+    (letter.upper() if figure_color == Color.White else letter): Figure(figure_type, figure_color)
+    for figure_type, letter in _fen_letters.items()
+    for figure_color in Color
+}
+
+
+starting_fen = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w - - 0 1"
+
+
+def board_to_placement(board):
+    """
+    Returns the piece placement field of the FEN notation of a board.
+
+    >>> from chess.board import starting_board
+    >>> board_to_placement(starting_board())
+    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR'
+    """
+    return board_placement(board)
+
+
+def _en_passant_field(game):
+    move = game.last_move
+    if (move != None and move.type == MoveType.RegularMove and
+            game.board.get((move.to.col, move.to.row)) == Figure(FigureType.Pawn, game.color.other()) and
+            abs(move.to.row - move.frm.row) == 2):
+        return Field(move.to.col, (move.to.row + move.frm.row) // 2)
+    return None
+
+
+def game_to_fen(game, fullmove_number=None):
+    """
+    Returns the FEN notation of a game position.
+    Castling is not supported yet, so the castling availability is always '-'.
+    Games do not count full moves, so unless given, the full move number
+    is computed from the length of the game history.
+
+    >>> game_to_fen(Game.new())
+    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w - - 0 1'
+
+    >>> game_to_fen(Game.new().move(Field(5,2), Field(5,4)))
+    'rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b - e3 0 1'
+    """
+    en_passant = _en_passant_field(game)
+    if fullmove_number == None:
+        fullmove_number = game.ply // 2 + 1
+    return "{} {} - {} {} {}".format(
+        board_to_placement(game.board),
+        "w" if game.color == Color.White else "b",
+        "-" if en_passant == None else str(en_passant),
+        game.halfmove_clock,
+        fullmove_number)
+
+
+def game_from_fen(fen, repetitions=None):
+    """
+    Returns a game with the position given in the FEN notation.
+    The castling availability and the full move number are ignored.
+    The half move clock and the en passant target field are kept.
+    The game history is empty; 'repetitions' may be given to carry over
+    the position repetition counts of a game (see 'Game.repetitions').
+
+    >>> print(game_from_fen('8/8/8/8/8/2k5/1q6/K7 w - - 12 40'))
+    White to begin:
+     abcdefgh
+    8........8
+    7........7
+    6........6
+    5........5
+    4........4
+    3..K.....3
+    2.Q......2
+    1k.......1
+     abcdefgh
+
+    >>> game_to_fen(game_from_fen('rnbqkbnr/ppp1pppp/8/8/3pP3/8/PPPP1PPP/RNBQKBNR b - e3 0 1'))
+    'rnbqkbnr/ppp1pppp/8/8/3pP3/8/PPPP1PPP/RNBQKBNR b - e3 0 1'
+
+    >>> game_from_fen('rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNX w - - 0 1')
+    Traceback (most recent call last):
+    ...
+    ValueError: invalid FEN figure: 'X'
+
+    >>> game_from_fen('8/8/8/8/8/8/8/8 w - - 0 1')
+    Traceback (most recent call last):
+    ...
+    ValueError: invalid FEN position: every side needs exactly one King
+
+    >>> game_from_fen('rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w - - 0 x')
+    Traceback (most recent call last):
+    ...
+    ValueError: invalid FEN full move number: 'x'
+    """
+    parts = fen.split()
+    if len(parts) < 2:
+        raise ValueError("invalid FEN: {!r}".format(fen))
+    rows = parts[0].split("/")
+    if len(rows) != 8:
+        raise ValueError("invalid FEN placement: {!r}".format(parts[0]))
+    board = {}
+    for row, text in zip(range(8,0,-1), rows):
+        col = 1
+        for char in text:
+            if char.isdigit():
+                col += int(char)
+            elif char in fen_figures:
+                board[(col,row)] = fen_figures[char]
+                col += 1
+            else:
+                raise ValueError("invalid FEN figure: {!r}".format(char))
+        if col != 9:
+            raise ValueError("invalid FEN row: {!r}".format(text))
+    for color in Color:
+        if sum(1 for figure in board.values() if figure == Figure(FigureType.King, color)) != 1:
+            raise ValueError("invalid FEN position: every side needs exactly one King")
+    if parts[1] not in ("w", "b"):
+        raise ValueError("invalid FEN color: {!r}".format(parts[1]))
+    color = Color.White if parts[1] == "w" else Color.Black
+    last_move = None
+    if len(parts) > 3 and parts[3] != "-":
+        passed = field_from_str(parts[3])
+        direction = 1 if color == Color.White else -1
+        last_move = Move(MoveType.RegularMove,
+                         Field(passed.col, passed.row + direction),
+                         Field(passed.col, passed.row - direction))
+    if len(parts) > 4 and not parts[4].isdigit():
+        raise ValueError("invalid FEN half move clock: {!r}".format(parts[4]))
+    if len(parts) > 5 and not (parts[5].isdigit() and int(parts[5]) >= 1):
+        raise ValueError("invalid FEN full move number: {!r}".format(parts[5]))
+    halfmove_clock = int(parts[4]) if len(parts) > 4 else 0
+    return Game(color, board, [], last_move, halfmove_clock=halfmove_clock, repetitions=repetitions)
+
+
+def field_from_str(text):
+    """
+    Returns the field with the given coordinates, such as 'e4'.
+
+    >>> field_from_str('e4')
+    e4
+
+    >>> field_from_str('j9')
+    Traceback (most recent call last):
+    ...
+    ValueError: invalid field: 'j9'
+    """
+    if len(text) == 2:
+        field = Field(ord(text[0]) - ord('a') + 1, ord(text[1]) - ord('0'))
+        if field.is_valid():
+            return field
+    raise ValueError("invalid field: {!r}".format(text))
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
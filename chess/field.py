@@ -1,4 +1,4 @@
-from color import Color
+from .color import Color
 
 class Field:
     """
@@ -36,6 +36,21 @@ class Field:
         return str(self)
 
 
+    def __eq__(self, other):
+        """
+        >>> Field(2,3) == Field(2,3)
+        True
+
+        >>> Field(2,3) == Field(3,2)
+        False
+        """
+        return isinstance(other, Field) and self.col == other.col and self.row == other.row
+
+
+    def __hash__(self):
+        return hash((self.col, self.row))
+
+
     def relative(self, c, r):
         """
         Returns a new field with coordinates moved
@@ -49,6 +64,16 @@ class Field:
         """
         return Field(self.col+c, self.row+r)
 
+    def index(self):
+        """
+        Returns the index of the field in the range between 0 and 63,
+        which is used as the bit number of the field in bitmasks of fields.
+
+        >>> Field(1,1).index(), Field(8,1).index(), Field(1,2).index(), Field(8,8).index()
+        (0, 7, 8, 63)
+        """
+        return (self.row-1)*8 + self.col-1
+
     def is_last_row(self, color):
         """
         Returns a boolean value indicating
@@ -96,6 +121,21 @@ class Field:
         """
         return self.col >= 1 and self.col <= 8 and self.row >= 1 and self.row <= 8
 
+def fields_from_mask(mask):
+    """
+    Returns the list of fields whose bits are set in a bitmask of fields.
+
+    >>> fields_from_mask((1 << Field(3,2).index()) | (1 << Field(8,8).index()))
+    [c2, h8]
+    """
+    fields = []
+    while mask:
+        bit = mask & -mask
+        index = bit.bit_length() - 1
+        fields.append(Field(index % 8 + 1, index // 8 + 1))
+        mask ^= bit
+    return fields
+
 if __name__ == "__main__":
     import doctest
     doctest.testmod()
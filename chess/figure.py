@@ -1,4 +1,4 @@
-from color import Color
+from .color import Color
 from enum import Enum, auto
     
 class FigureType(Enum):
@@ -12,6 +12,49 @@ class FigureType(Enum):
     Knight = auto()
     Pawn = auto()
 
+# The material values of the figures, in centipawns.
+# The value of the King only makes sure that it is never exchanged.
+figure_values = {
+    FigureType.King: 20000,
+    FigureType.Queen: 900,
+    FigureType.Rook: 500,
+    FigureType.Bishop: 330,
+    FigureType.Knight: 320,
+    FigureType.Pawn: 100,
+}
+
+# The one-character representations of the figures, keyed by (figure type, figure color) pairs:
+# letters (lower case for the White figures, upper case for the Black ones) and unicode symbols.
+figure_letters = {
+    (FigureType.King, Color.White): "k",
+    (FigureType.Queen, Color.White): "q",
+    (FigureType.Rook, Color.White): "r",
+    (FigureType.Bishop, Color.White): "b",
+    (FigureType.Knight, Color.White): "n",
+    (FigureType.Pawn, Color.White): "p",
+    (FigureType.King, Color.Black): "K",
+    (FigureType.Queen, Color.Black): "Q",
+    (FigureType.Rook, Color.Black): "R",
+    (FigureType.Bishop, Color.Black): "B",
+    (FigureType.Knight, Color.Black): "N",
+    (FigureType.Pawn, Color.Black): "P",
+}
+
+figure_symbols = {
+    (FigureType.King, Color.White): "\u2654",
+    (FigureType.Queen, Color.White): "\u2655",
+    (FigureType.Rook, Color.White): "\u2656",
+    (FigureType.Bishop, Color.White): "\u2657",
+    (FigureType.Knight, Color.White): "\u2658",
+    (FigureType.Pawn, Color.White): "\u2659",
+    (FigureType.King, Color.Black): "\u265a",
+    (FigureType.Queen, Color.Black): "\u265b",
+    (FigureType.Rook, Color.Black): "\u265c",
+    (FigureType.Bishop, Color.Black): "\u265d",
+    (FigureType.Knight, Color.Black): "\u265e",
+    (FigureType.Pawn, Color.Black): "\u265f",
+}
+
 class Figure:
     """
     Represents a figure, which has a type and a color.
@@ -21,6 +64,21 @@ class Figure:
         self.figure_type = figure_type
         self.figure_color = figure_color
 
+    def __eq__(self, other):
+        """
+        >>> Figure(FigureType.King, Color.White) == Figure(FigureType.King, Color.White)
+        True
+
+        >>> Figure(FigureType.King, Color.White) == Figure(FigureType.King, Color.Black)
+        False
+        """
+        return (isinstance(other, Figure) and
+                self.figure_type == other.figure_type and
+                self.figure_color == other.figure_color)
+
+    def __hash__(self):
+        return hash((self.figure_type, self.figure_color))
+
     def __str__(self):
         """
         Returns a one-character string representing the figure.
@@ -61,35 +119,19 @@ class Figure:
         >>> print(Figure(FigureType.Pawn, Color.Black))
         P
         """
-        if   self.figure_type is FigureType.King   and self.figure_color is Color.White: return "k"
-        elif self.figure_type is FigureType.Queen  and self.figure_color is Color.White: return "q"
-        elif self.figure_type is FigureType.Rook   and self.figure_color is Color.White: return "r"
-        elif self.figure_type is FigureType.Bishop and self.figure_color is Color.White: return "b"
-        elif self.figure_type is FigureType.Knight and self.figure_color is Color.White: return "n"
-        elif self.figure_type is FigureType.Pawn   and self.figure_color is Color.White: return "p"
-        elif self.figure_type is FigureType.King   and self.figure_color is Color.Black: return "K"
-        elif self.figure_type is FigureType.Queen  and self.figure_color is Color.Black: return "Q"
-        elif self.figure_type is FigureType.Rook   and self.figure_color is Color.Black: return "R"
-        elif self.figure_type is FigureType.Bishop and self.figure_color is Color.Black: return "B"
-        elif self.figure_type is FigureType.Knight and self.figure_color is Color.Black: return "N"
-        elif self.figure_type is FigureType.Pawn   and self.figure_color is Color.Black: return "P"
+        return figure_letters[(self.figure_type, self.figure_color)]
+
+    def __repr__(self):
+        return str(self)
 
     def figure_symbol(self):
         """
         Returns a unicode symbol representing the figure.
+
+        >>> print(Figure(FigureType.Knight, Color.Black).figure_symbol())
+        ♞
         """
-        if   self.figure_type is FigureType.King   and self.figure_color is Color.White: return "\u2654"
-        elif self.figure_type is FigureType.Queen  and self.figure_color is Color.White: return "\u2655"
-        elif self.figure_type is FigureType.Rook   and self.figure_color is Color.White: return "\u2656"
-        elif self.figure_type is FigureType.Bishop and self.figure_color is Color.White: return "\u2657"
-        elif self.figure_type is FigureType.Knight and self.figure_color is Color.White: return "\u2658"
-        elif self.figure_type is FigureType.Pawn   and self.figure_color is Color.White: return "\u2659"
-        elif self.figure_type is FigureType.King   and self.figure_color is Color.Black: return "\u265a"
-        elif self.figure_type is FigureType.Queen  and self.figure_color is Color.Black: return "\u265b"
-        elif self.figure_type is FigureType.Rook   and self.figure_color is Color.Black: return "\u265c"
-        elif self.figure_type is FigureType.Bishop and self.figure_color is Color.Black: return "\u265d"
-        elif self.figure_type is FigureType.Knight and self.figure_color is Color.Black: return "\u265e"
-        elif self.figure_type is FigureType.Pawn   and self.figure_color is Color.Black: return "\u265f"
+        return figure_symbols[(self.figure_type, self.figure_color)]
 
 
 if __name__ == "__main__":
@@ -1,8 +1,8 @@
 
 from itertools import takewhile
-from field import Field
-from figure import Figure, FigureType
-from color import Color
+from .field import Field
+from .figure import Figure, FigureType
+from .color import Color
 
 def rook_moves():
     """
@@ -1,20 +1,106 @@
 
+from enum import Enum, auto
 from itertools import chain, dropwhile, takewhile
-from board import starting_board, show_board, update_board
-from color import Color
-from field import Field
-from figure import Figure, FigureType
-from figure_moves import figure_moves
-from move import Move, MoveType
+from .board import starting_board, show_board, update_board, board_changes, figure_counts
+from .color import Color
+from .field import Field
+from .figure import Figure, FigureType, figure_values
+from .figure_moves import figure_moves, rook_moves, bishop_moves, knight_moves, relative_fields
+from .move import Move, MoveType
+from .zobrist import board_key, pawn_structure_key, figure_key, black_to_move_key
+from . import stats
+
+
+class DrawReason(Enum):
+    """
+    Represents the reasons for which a game may end in a draw.
+    """
+    Stalemate = auto()
+    InsufficientMaterial = auto()
+    ThreefoldRepetition = auto()
+    FiftyMoveRule = auto()
+
+
+_orthogonal_rays = rook_moves()
+_diagonal_rays = bishop_moves()
+_knight_jumps = knight_moves()
+
+
+def _attacks_along_ray(figure, diagonal, distance, ray):
+    """
+    Verifies if a figure standing on a ray, at the given distance from
+    the ray origin, attacks the origin.
+    """
+    figure_type = figure.figure_type
+    if figure_type == FigureType.Queen:
+        return True
+    elif figure_type == FigureType.King:
+        return distance == 1
+    elif diagonal:
+        if figure_type == FigureType.Pawn:
+            return distance == 1 and ray[1][0] == (-1 if figure.figure_color == Color.White else 1)
+        else:
+            return figure_type == FigureType.Bishop
+    else:
+        return figure_type == FigureType.Rook
+
 
 class Game:
 
     
-    def __init__(self, color, board, hist, last_move):
+    def __init__(self, color, board, hist, last_move,
+                 counts=None, halfmove_clock=0, key=None, repetitions=None, pawn_key=None, parent=None):
+        """
+        Besides the board, a game keeps state which is updated incrementally
+        with every move, so that the end of the game may be detected
+        without scanning the board or the history:
+        the numbers of figures of every type and color,
+        the number of half-moves since the last capture or Pawn move,
+        the Zobrist hash key of the position and the number of times
+        each position occurred since the last capture or Pawn move.
+        A separate Zobrist hash key of the Pawns alone identifies
+        the Pawn structure.
+        Missing values are computed from the board.
+        A game updated with a move links to its parent game instead of
+        copying the history, which is rebuilt only when 'hist' is read;
+        'ply' is the length of the history.
+        """
+        if stats.active is not None:
+            stats.active.count("games")
         self.color = color
         self.board = board
-        self.hist = hist
+        self.parent = parent
+        if parent is None:
+            self._first_hist = hist
+            self.ply = len(hist)
+        else:
+            self._first_hist = parent._first_hist
+            self.ply = parent.ply + 1
         self.last_move = last_move
+        self.counts = figure_counts(board) if counts is None else counts
+        self.halfmove_clock = halfmove_clock
+        self.key = board_key(board, color) if key is None else key
+        self.repetitions = {self.key: 1} if repetitions is None else repetitions
+        self.pawn_key = pawn_structure_key(board) if pawn_key is None else pawn_key
+        self._has_valid_move = None
+
+
+    @property
+    def hist(self):
+        """
+        Returns the previous games, from the first one on.
+
+        >>> g = Game.new().move(Field(5,2), Field(5,4)).move(Field(5,7), Field(5,5))
+        >>> g.ply, [game.ply for game in g.hist], g.hist[1] is g.parent
+        (2, [0, 1], True)
+        """
+        games = []
+        game = self
+        while game.parent is not None:
+            game = game.parent
+            games.append(game)
+        games.reverse()
+        return game._first_hist + games
 
 
     def new():
@@ -146,8 +232,49 @@ class Game:
     def updated(self, move):
         """
         Returns a new game, updated with a move.
+
+        >>> g = Game.new().updated(Move(MoveType.RegularMove, Field(7,1), Field(6,3)))
+        >>> g.color, g.halfmove_clock, len(g.hist)
+        (<Color.Black: 8>, 1, 1)
+
+        >>> g.key == Game(g.color, g.board, [], None).key
+        True
+
+        >>> g.pawn_key == Game.new().pawn_key
+        True
+
+        >>> g = g.updated(Move(MoveType.RegularMove, Field(5,7), Field(5,5)))
+        >>> g.halfmove_clock, g.repetitions == {g.key: 1}
+        (0, True)
+
+        >>> g.pawn_key == Game(g.color, g.board, [], None).pawn_key
+        True
         """
-        return Game(self.color.other(), update_board(self.board, move), self.hist.append(self), move)
+        removed, added = board_changes(self.board, move)
+        counts = self.counts.copy()
+        key = self.key ^ black_to_move_key
+        pawn_key = self.pawn_key
+        for field_key, figure in removed:
+            counts[(figure.figure_type, figure.figure_color)] -= 1
+            key ^= figure_key(field_key, figure)
+            if figure.figure_type == FigureType.Pawn:
+                pawn_key ^= figure_key(field_key, figure)
+        for field_key, figure in added:
+            counts[(figure.figure_type, figure.figure_color)] = counts.get((figure.figure_type, figure.figure_color), 0) + 1
+            key ^= figure_key(field_key, figure)
+            if figure.figure_type == FigureType.Pawn:
+                pawn_key ^= figure_key(field_key, figure)
+        irreversible = len(removed) > len(added) or (
+            len(removed) > 0 and removed[0][1].figure_type == FigureType.Pawn)
+        if irreversible:
+            halfmove_clock = 0
+            repetitions = {key: 1}
+        else:
+            halfmove_clock = self.halfmove_clock + 1
+            repetitions = self.repetitions.copy()
+            repetitions[key] = repetitions.get(key, 0) + 1
+        return Game(self.color.other(), update_board(self.board, move), None, move,
+                    counts, halfmove_clock, key, repetitions, pawn_key, self)
 
 
     def _castling(self, king_to, rook_from, rook_to, other_col):
@@ -174,17 +301,51 @@ class Game:
         #    Field(rookFrom,row), Field(rookTo,row))))
         # else Seq()
 
-    
+
+    def _is_en_passant_capture(self, frm, to):
+        """
+        Verifies if the en passant capture move is possible.
+
+        >>> g = Game.new().updated(Move(MoveType.RegularMove, Field(5,2), Field(5,5)))
+        >>> g = g.updated(Move(MoveType.RegularMove, Field(4,7), Field(4,5)))
+        >>> g._is_en_passant_capture(Field(5,5), Field(4,6))
+        True
+
+        >>> g._is_en_passant_capture(Field(5,5), Field(6,6))
+        False
+        """
+        return (self.last_move is not None and
+                self.board.get((to.col, frm.row)) == Figure(FigureType.Pawn, self.color.other()) and
+                self.last_move.to == Field(to.col, frm.row) and
+                self.last_move.frm == Field(to.col, frm.row + 2*(to.row-frm.row)))
+
+
     def _next_games_for_figure(self, field, figure):
         """
-        >>> 1
-        1
+        >>> len(Game.new()._next_games_for_figure(Field(2,1), Figure(FigureType.Knight, Color.White)))
+        2
+
+        >>> len(Game.new()._next_games_for_figure(Field(2,2), Figure(FigureType.Pawn, Color.White)))
+        2
         """
         if figure.figure_type == FigureType.Pawn:
-            return []
+            def regular_or_promotion_games(to):
+                if to.is_last_row(self.color):
+                    return map(lambda promoted: self.updated(Move(MoveType.PromotionMove, field, to, figure=Figure(promoted, self.color))),
+                               [FigureType.Queen, FigureType.Rook, FigureType.Bishop, FigureType.Knight])
+                else:
+                    return [self.updated(Move(MoveType.RegularMove, field, to))]
+            games_after_regular_and_promotion_moves = chain(*map(
+                regular_or_promotion_games,
+                self.capture_destinations(figure_moves(figure, field, True)) +
+                self.free_destinations(figure_moves(figure, field, False))))
+            games_after_en_passant_moves = map(
+                lambda to: self.updated(Move(MoveType.EnPassantMove, field, to, captured=Field(to.col, field.row))),
+                filter(lambda to: self._is_en_passant_capture(field, to),
+                       self.free_destinations(figure_moves(figure, field, True))))
+            games = list(games_after_regular_and_promotion_moves) + list(games_after_en_passant_moves)
         else:
             fieldss = figure_moves(figure, field, False)
-            print(figure, field, fieldss, self.free_destinations(fieldss))
             games_after_regular_moves = map(
                 lambda to: self.updated(Move(MoveType.RegularMove, field, to)),
                 self.free_destinations(fieldss) + self.capture_destinations(fieldss))
@@ -192,9 +353,20 @@ class Game:
                 games_after_castling_moves = self._castling(3,1,4,2) + self._castling(7,8,6,7)
             else:
                 games_after_castling_moves = []
-            return list(games_after_regular_moves)
+            games = list(games_after_regular_moves) + games_after_castling_moves
+        if stats.active is not None:
+            stats.active.count("moves." + figure.figure_type.name, len(games))
+        return games
+
+
+    def _iter_next_games(self):
+        return chain.from_iterable(map(
+            lambda item: self._next_games_for_figure(Field(item[0][0], item[0][1]), item[1]),
+            filter(
+                lambda item: item[1].figure_color == self.color,
+                list(self.board.items()))))
+
 
-    
     def next_games(self):
         """
         Returns next games after possible next moves moves (including those
@@ -216,116 +388,341 @@ class Game:
         or right onto a free field which has been passed-by by an enemy Pawn in the
         previous move.
 
-        >>> list(Game.new().next_games())
+        >>> len(Game.new().next_games())
+        20
         """
-        return list(chain(*map(
-            lambda item: self._next_games_for_figure(Field(item[0][0], item[0][1]), item[1]),
-            filter(
-                lambda item: item[1].figure_color == self.color,
-                self.board.items()))))
-#      flatMap{ case (from, figure) => 
-#        figure.figureType match {
-#          case Pawn =>
-#            val regularAndPromotionMoves =
-#              (capture_destinations(figureMoves(figure,from,true))++
-#                free_destinations(figureMoves(figure,from,false))).
-#                flatMap(to =>
-#                  if (to.isLastRow(color))
-#                    Seq(Figure(Queen,color),Figure(Rook,color),Figure(Bishop,color),Figure(Knight,color)).
-#                    map(figure => updated(PromotionMove(from,to,figure)))
-#                  else Seq(updated(RegularMove(from,to))))
-#            val enPassantMoves =
-#              free_destinations(figureMoves(figure,from,true)).
-#                filter(isEnPassantCapture(from,_)).map(to =>
-#                  updated(EnPassantMove(from, to, Field(to.col,from.row))))
-#            regularAndPromotionMoves ++ enPassantMoves
-#          case _ => Seq.empty
-#        }
-#      }
-#
-#  def isOtherKingUnderCheck: Boolean = {
-#    * Verifies if the enemy King is under check.
-#    """
-#    def isKingOnBoard(g: Game) = g.board.values.exists(fig => fig == Figure(King,color.other))
-#    !nextGames.forall(isKingOnBoard)
-#  }
-#
-#  def isKingUnderCheck: Boolean =
-#    * Verifies if the King of the player who is about to make a move is under check.
-#    """
-#    new OngoingGame(color.other, board, this :: hist,
-#      RegularMove(Field(0,0),Field(0,0))).isOtherKingUnderCheck
-#
-#
-#  def isEnPassantCapture(from: Field, to: Field) = this match {
-#    * Verifies if the en passant capture move is possible.
-#    """
-#    case GameStart => false
-#    case g:OngoingGame =>
-#      g.board.get(g.lastMove.to) == Some(Figure(Pawn,color.other)) &&
-#      g.lastMove.to == Field(to.col, from.row) &&
-#      g.lastMove.from == Field(to.col, from.row + 2*(to.row-from.row))
-#  }
-#
-#
-#  def validGames = nextGames.filter{ g => !g.isOtherKingUnderCheck }
-#    * Filters out the next games in which the king is under check.
-#    """
-#
-#  def isGameFinished: Boolean =
-#    * Verifies if the game is over.
-#    * The following end game conditions are handled:
-#    * + after every possible move the King is under check,
-#    * + only the two Kings are left on the board,
-#    * + only the two Kings, one Bishop and one Knight are left on the board,
-#    * + only the two Kings and two Knights of the same color are left on the board,
-#    * + the same position occurred three times.
-#    nextGames.forall(_.isOtherKingUnderCheck) ||
-#    Set[Set[Figure]](Set(Figure(King,White),Figure(King,Black)),
-#                     Set(Figure(King,White),Figure(King,Black),Figure(Bishop,White)),
-#                     Set(Figure(King,White),Figure(King,Black),Figure(Bishop,Black)),
-#                     Set(Figure(King,White),Figure(King,Black),Figure(Knight,White)),
-#                     Set(Figure(King,White),Figure(King,Black),Figure(Knight,Black)),
-#                     Set(Figure(King,White),Figure(King,Black),Figure(Knight,White),Figure(Knight,White)),
-#                     Set(Figure(King,White),Figure(King,Black),Figure(Knight,Black),Figure(Knight,Black))).
-#      contains(board.values.toSet) ||
-#      !(board :: hist.map(_.board)).
-#        groupBy(identity).values.toSet.filter(_.size >= 3).isEmpty
-#
-#  def winner: Option[Color] = if (isGameFinished && isKingUnderCheck)
-#    * Returns an option with the color of the game winner.
-#    """
-#    Some(color.other) else None
-#
-#  def move(from: Field, to: Field, promotion: Option[Figure] = None) = {
-#    * Returns an option with a new game state after moving a figure.
-#    """
-#    def isMatching(game: OngoingGame) =
-#      game.lastMove.from == from &&
-#      game.lastMove.to == to &&
-#      (game.lastMove match {
-#        case PromotionMove(_,_,prom) => Some(prom) == promotion
-#        case _ => promotion == None })
-#    validGames.filter(isMatching).toList.headOption
-#  }
-#}
-#GameStart.isOtherKingUnderCheck // false
-#GameStart.isKingUnderCheck // false
-#GameStart.isGameFinished // false
-#GameStart.winner // None
-#GameStart.nextGames.size // 20
-#GameStart.validGames.size // 20
-#GameStart.move(Field(1,2),Field(1,5),None) // None
-#val g1 = GameStart.move(Field(7,2),Field(7,4),None).get
-#val g2 = g1.move(Field(5,7),Field(5,6),None).get
-#val g3 = g2.move(Field(6,2),Field(6,4),None).get
-#val g4 = g3.move(Field(4,8),Field(8,4),None).get
-#g4.isOtherKingUnderCheck // false
-#g4.isKingUnderCheck // true
-#g4.isGameFinished // true
-#g4.winner // Some(Black)
-#g4.nextGames.size // 20
-#g4.validGames.size // 0
+        return list(self._iter_next_games())
+
+
+    def _attackers(self, field, color, removed, xray):
+        """
+        Returns the bitmask of the fields occupied by the figures of the given color
+        attacking the field. The fields set in the 'removed' bitmask are treated as empty.
+        If 'xray' is set, figures attacking through other figures attacking
+        along the same line are included as well.
+        """
+        board = self.board
+        mask = 0
+        for c, r in _knight_jumps:
+            col, row = field.col + c[0], field.row + r[0]
+            figure = board.get((col, row))
+            if (figure != None and figure.figure_type == FigureType.Knight and figure.figure_color == color and
+                    not (removed >> ((row-1)*8 + col-1)) & 1):
+                mask |= 1 << ((row-1)*8 + col-1)
+        for rays, diagonal in ((_orthogonal_rays, False), (_diagonal_rays, True)):
+            for ray in rays:
+                for distance, f in enumerate(relative_fields(field, ray), 1):
+                    bit = 1 << f.index()
+                    if removed & bit:
+                        continue
+                    figure = board.get((f.col, f.row))
+                    if figure == None:
+                        continue
+                    if not _attacks_along_ray(figure, diagonal, distance, ray):
+                        break
+                    if figure.figure_color == color:
+                        mask |= bit
+                    if not xray:
+                        break
+        return mask
+
+
+    def attackers(self, field, color):
+        """
+        Returns the bitmask of the fields occupied by the figures of the given color
+        attacking the field, including the x-ray attackers, that is the figures
+        which would attack the field after the figures standing in front of them
+        on the same line and attacking the field as well have moved away.
+        The fields are numbered as returned by 'Field.index'.
+
+        >>> from chess.field import fields_from_mask
+        >>> fields_from_mask(Game.new().attackers(Field(6,3), Color.White))
+        [d1, g1, e2, g2]
+
+        >>> g = Game(Color.White, {(1,1): Figure(FigureType.Rook, Color.White),
+        ...                        (1,2): Figure(FigureType.Queen, Color.White),
+        ...                        (1,8): Figure(FigureType.Rook, Color.Black),
+        ...                        (2,6): Figure(FigureType.Pawn, Color.Black)}, [], None)
+        >>> fields_from_mask(g.attackers(Field(1,5), Color.White))
+        [a1, a2]
+
+        >>> fields_from_mask(g.attackers(Field(1,5), Color.Black))
+        [b6, a8]
+        """
+        return self._attackers(field, color, 0, True)
+
+
+    def _least_valuable_attacker(self, field, color, removed):
+        """
+        Returns the field and the figure of the least valuable figure of the given color
+        directly attacking the field, or None if there is no such figure.
+        """
+        best = None
+        mask = self._attackers(field, color, removed, False)
+        while mask:
+            bit = mask & -mask
+            index = bit.bit_length() - 1
+            figure = self.board[(index % 8 + 1, index // 8 + 1)]
+            if best == None or figure_values[figure.figure_type] < figure_values[best[1].figure_type]:
+                best = (bit, figure)
+            mask ^= bit
+        return best
+
+
+    def see(self, move):
+        """
+        Returns the static exchange evaluation of a move, that is the material
+        balance (in centipawns, from the point of view of the player making the move)
+        of the sequence of captures on the destination field, in which both players
+        capture with their least valuable figures and may stop capturing at any time.
+        No moves are made; figures standing behind the capturing figures
+        join the exchange as their lines open.
+
+        >>> g = Game(Color.White, {(5,1): Figure(FigureType.King, Color.White),
+        ...                        (5,8): Figure(FigureType.King, Color.Black),
+        ...                        (4,1): Figure(FigureType.Rook, Color.White),
+        ...                        (4,5): Figure(FigureType.Pawn, Color.Black),
+        ...                        (3,6): Figure(FigureType.Pawn, Color.Black)}, [], None)
+        >>> g.see(Move(MoveType.RegularMove, Field(4,1), Field(4,5)))
+        -400
+
+        >>> g = Game(Color.White, {(5,1): Figure(FigureType.King, Color.White),
+        ...                        (5,8): Figure(FigureType.King, Color.Black),
+        ...                        (4,1): Figure(FigureType.Rook, Color.White),
+        ...                        (4,2): Figure(FigureType.Queen, Color.White),
+        ...                        (4,5): Figure(FigureType.Knight, Color.Black),
+        ...                        (4,8): Figure(FigureType.Rook, Color.Black)}, [], None)
+        >>> g.see(Move(MoveType.RegularMove, Field(4,2), Field(4,5)))
+        -80
+
+        >>> g.see(Move(MoveType.RegularMove, Field(4,1), Field(4,5)))
+        320
+
+        >>> g = Game(Color.White, {(1,1): Figure(FigureType.King, Color.White),
+        ...                        (8,8): Figure(FigureType.King, Color.Black),
+        ...                        (7,2): Figure(FigureType.Pawn, Color.White),
+        ...                        (5,2): Figure(FigureType.Pawn, Color.White),
+        ...                        (6,3): Figure(FigureType.Queen, Color.Black),
+        ...                        (5,1): Figure(FigureType.Knight, Color.Black)}, [], None)
+        >>> g.see(Move(MoveType.RegularMove, Field(7,2), Field(6,3)))
+        900
+        """
+        from_key = (move.frm.col, move.frm.row)
+        to_key = (move.to.col, move.to.row)
+        figure = self.board[from_key]
+        removed = 1 << move.frm.index()
+        if move.type == MoveType.EnPassantMove:
+            captured_field = move.data['captured']
+            removed |= 1 << captured_field.index()
+            gain = [figure_values[FigureType.Pawn]]
+        elif to_key in self.board:
+            gain = [figure_values[self.board[to_key].figure_type]]
+        else:
+            gain = [0]
+        if move.type == MoveType.PromotionMove:
+            promoted = move.data['figure'].figure_type
+            gain[0] += figure_values[promoted] - figure_values[FigureType.Pawn]
+            on_field = figure_values[promoted]
+        else:
+            on_field = figure_values[figure.figure_type]
+        color = self.color.other()
+        while True:
+            attacker = self._least_valuable_attacker(move.to, color, removed)
+            if attacker == None:
+                break
+            gain.append(on_field - gain[-1])
+            bit, figure = attacker
+            removed |= bit
+            on_field = figure_values[figure.figure_type]
+            color = color.other()
+        while len(gain) > 1:
+            last = gain.pop()
+            gain[-1] = -max(-gain[-1], last)
+        return gain[0]
+
+
+    def _find_king(self, color):
+        king = Figure(FigureType.King, color)
+        for (col, row), figure in self.board.items():
+            if figure == king:
+                return Field(col, row)
+        return None
+
+
+    def _is_king_attacked_by(self, color):
+        """
+        Verifies if the King of the color opposite to the given one
+        may be captured by a figure of the given color.
+        """
+        if stats.active is not None:
+            stats.active.count("check_tests")
+        king_field = self._find_king(color.other())
+        return king_field != None and self._attackers(king_field, color, 0, False) != 0
+
+
+    def is_other_king_under_check(self):
+        """
+        Verifies if the enemy King is under check.
+
+        >>> Game.new().is_other_king_under_check()
+        False
+        """
+        return self._is_king_attacked_by(self.color)
+
+
+    def is_king_under_check(self):
+        """
+        Verifies if the King of the player who is about to make a move is under check.
+
+        >>> Game.new().is_king_under_check()
+        False
+        """
+        return self._is_king_attacked_by(self.color.other())
+
+
+    def valid_games(self):
+        """
+        Filters out the next games in which the king is under check.
+
+        >>> len(Game.new().valid_games())
+        20
+        """
+        return [g for g in self.next_games() if not g.is_other_king_under_check()]
+
+
+    def has_valid_move(self):
+        """
+        Verifies if the player who is about to make a move has any valid move.
+        This is the only check made when detecting the end of the game which
+        requires generating moves. It stops at the first valid move found and
+        its result is remembered.
+
+        >>> Game.new().has_valid_move()
+        True
+        """
+        if self._has_valid_move is None:
+            self._has_valid_move = any(not g.is_other_king_under_check() for g in self._iter_next_games())
+        return self._has_valid_move
+
+
+    def _is_insufficient_material(self):
+        """
+        Verifies if only the two Kings are left on the board, or the two Kings
+        and one Bishop or one Knight, or the two Kings and two Knights of the same color.
+        """
+        others = [(figure_type, count) for (figure_type, _), count in self.counts.items()
+                  if count > 0 and figure_type != FigureType.King]
+        if len(others) == 0:
+            return True
+        elif len(others) == 1:
+            figure_type, count = others[0]
+            return ((count == 1 and figure_type in (FigureType.Bishop, FigureType.Knight)) or
+                    (count == 2 and figure_type == FigureType.Knight))
+        else:
+            return False
+
+
+    def draw_reason(self):
+        """
+        Returns the reason for which the game ended in a draw,
+        or None if the game did not end in a draw.
+
+        >>> Game.new().draw_reason()
+
+        >>> g = Game.new()
+        >>> for frm, to in [((7,1), (6,3)), ((7,8), (6,6)), ((6,3), (7,1)), ((6,6), (7,8))] * 2:
+        ...     g = g.move(Field(*frm), Field(*to))
+        >>> g.draw_reason()
+        <DrawReason.ThreefoldRepetition: 3>
+
+        >>> Game(Color.White, {(1,1): Figure(FigureType.King, Color.White),
+        ...                    (3,3): Figure(FigureType.King, Color.Black),
+        ...                    (4,4): Figure(FigureType.Knight, Color.Black)}, [], None).draw_reason()
+        <DrawReason.InsufficientMaterial: 2>
+
+        >>> Game(Color.White, {(1,1): Figure(FigureType.King, Color.White),
+        ...                    (3,3): Figure(FigureType.King, Color.Black),
+        ...                    (2,3): Figure(FigureType.Queen, Color.Black)}, [], None).draw_reason()
+        <DrawReason.Stalemate: 1>
+
+        >>> Game(Color.White, {(1,1): Figure(FigureType.King, Color.White),
+        ...                    (3,3): Figure(FigureType.King, Color.Black),
+        ...                    (8,8): Figure(FigureType.Rook, Color.Black)}, [], None, halfmove_clock=100).draw_reason()
+        <DrawReason.FiftyMoveRule: 4>
+        """
+        if self._is_insufficient_material():
+            return DrawReason.InsufficientMaterial
+        elif self.repetitions.get(self.key, 0) >= 3:
+            return DrawReason.ThreefoldRepetition
+        elif not self.has_valid_move():
+            if self.is_king_under_check():
+                return None
+            else:
+                return DrawReason.Stalemate
+        elif self.halfmove_clock >= 100:
+            return DrawReason.FiftyMoveRule
+        else:
+            return None
+
+
+    def is_game_finished(self):
+        """
+        Verifies if the game is over.
+        The following end game conditions are handled:
+        + the player who is about to make a move has no valid move
+          (which means either a checkmate or a stalemate),
+        + only the two Kings, or the two Kings and one Bishop or one Knight,
+          or the two Kings and two Knights of the same color are left on the board,
+        + the same position occurred three times,
+        + fifty moves of each player were made without a capture or a Pawn move.
+
+        >>> Game.new().is_game_finished()
+        False
+        """
+        return self.draw_reason() is not None or not self.has_valid_move()
+
+
+    def winner(self):
+        """
+        Returns the color of the game winner, or None
+        if the game is not finished or ended in a draw.
+
+        >>> Game.new().winner()
+
+        >>> g = Game.new().move(Field(7,2), Field(7,4))
+        >>> g = g.move(Field(5,7), Field(5,6))
+        >>> g = g.move(Field(6,2), Field(6,4))
+        >>> g = g.move(Field(4,8), Field(8,4))
+        >>> g.is_other_king_under_check(), g.is_king_under_check()
+        (False, True)
+        >>> g.is_game_finished(), g.winner()
+        (True, <Color.Black: 8>)
+        >>> len(g.next_games()), len(g.valid_games())
+        (20, 0)
+        """
+        if not self.has_valid_move() and self.is_king_under_check():
+            return self.color.other()
+        else:
+            return None
+
+
+    def move(self, frm, to, promotion=None):
+        """
+        Returns a new game state after moving a figure,
+        or None if the move is not valid.
+
+        >>> Game.new().move(Field(1,2), Field(1,5))
+
+        >>> Game.new().move(Field(1,2), Field(1,4)).last_move.to
+        a4
+        """
+        def is_matching(game):
+            return (game.last_move.frm == frm and
+                    game.last_move.to == to and
+                    game.last_move.data.get('figure') == promotion)
+        return next((g for g in self._iter_next_games()
+                     if is_matching(g) and not g.is_other_king_under_check()), None)
+
 
 if __name__ == "__main__":
     import doctest
@@ -0,0 +1,89 @@
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+# Knight moves returning to the initial position: every cycle of them repeats
+# the position, so the games end with a threefold repetition after two cycles.
+shuffle_moves = ["g1f3", "g8f6", "f3g1", "f6g8"]
+
+
+def percentile(values, p):
+    """
+    Returns the p-th percentile of the values (the nearest-rank method).
+
+    >>> percentile([5, 1, 4, 2, 3], 50)
+    3
+    >>> percentile(list(range(1, 101)), 99)
+    99
+    """
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * p // 100))
+    return ordered[int(rank) - 1]
+
+
+async def _request(reader, writer, request):
+    writer.write((json.dumps(request) + "\n").encode())
+    await writer.drain()
+    return json.loads(await reader.readline())
+
+
+async def _client(connect, moves, latencies):
+    reader, writer = await connect()
+    try:
+        game = None
+        ply = 0
+        while len(latencies) < moves:
+            if game is None:
+                game = (await _request(reader, writer, {"op": "new"}))["game"]
+                ply = 0
+            start = time.perf_counter()
+            response = await _request(reader, writer, {"op": "move", "game": game,
+                                                       "move": shuffle_moves[ply % len(shuffle_moves)]})
+            latencies.append(time.perf_counter() - start)
+            ply += 1
+            if not response["ok"]:
+                raise RuntimeError(response["error"])
+            if response["status"] != "ongoing":
+                await _request(reader, writer, {"op": "close", "game": game})
+                game = None
+    finally:
+        writer.close()
+
+
+async def run_load(clients, moves, host="127.0.0.1", port=7777, path=None):
+    """
+    Plays games on a running server from 'clients' concurrent connections
+    until 'moves' moves are made, and returns the throughput and latency summary.
+    """
+    if path is not None:
+        connect = lambda: asyncio.open_unix_connection(path)
+    else:
+        connect = lambda: asyncio.open_connection(host, port)
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*[_client(connect, moves, latencies) for _ in range(clients)])
+    seconds = time.perf_counter() - start
+    return {"clients": clients, "moves": len(latencies), "seconds": seconds,
+            "moves_per_second": len(latencies) / seconds,
+            "p50_ms": 1000 * percentile(latencies, 50),
+            "p99_ms": 1000 * percentile(latencies, 99)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load generator for the chess game server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7777)
+    parser.add_argument("--unix", metavar="PATH", help="connect to a Unix socket instead of TCP")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--moves", type=int, default=5000)
+    args = parser.parse_args(argv)
+    summary = asyncio.run(run_load(args.clients, args.moves, args.host, args.port, args.unix))
+    print("{moves} moves from {clients} clients in {seconds:.2f}s: {moves_per_second:.0f} moves/s, "
+          "p50 {p50_ms:.2f}ms, p99 {p99_ms:.2f}ms".format(**summary))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+from .field import Field
+from .figure import Figure, FigureType
+from .fen import field_from_str
+from .figure_moves import figure_moves
+from .move import Move, MoveType
+
+_san_letters = {
+    FigureType.King: "K",
+    FigureType.Queen: "Q",
+    FigureType.Rook: "R",
+    FigureType.Bishop: "B",
+    FigureType.Knight: "N",
+}
+
+_promotion_letters = {
+    "q": FigureType.Queen,
+    "r": FigureType.Rook,
+    "b": FigureType.Bishop,
+    "n": FigureType.Knight,
+}
+
+
+def move_to_uci(move):
+    """
+    Returns a move in the coordinate notation used by the UCI protocol,
+    such as 'e2e4' or 'e7e8q'.
+
+    >>> from chess.game import Game
+    >>> move_to_uci(Game.new().valid_games()[0].last_move)
+    'b1c3'
+    """
+    text = str(move.frm) + str(move.to)
+    if move.type == MoveType.PromotionMove:
+        text += str(move.data['figure']).lower()
+    return text
+
+
+def _parse_uci(game, text):
+    if len(text) not in (4, 5) or (len(text) == 5 and text[4] not in _promotion_letters):
+        raise ValueError("invalid move: {!r}".format(text))
+    frm = field_from_str(text[0:2])
+    to = field_from_str(text[2:4])
+    promotion = Figure(_promotion_letters[text[4]], game.color) if len(text) == 5 else None
+    return frm, to, promotion
+
+
+def move_from_uci(game, text):
+    """
+    Returns the move given in the UCI coordinate notation, with its type
+    (a promotion or an en passant capture) taken from the game position,
+    or None if the figure on its source field cannot make it.
+    Unlike 'play_uci', it only generates the destinations of the moving figure,
+    and it does not verify that the move does not leave the King in check.
+
+    >>> from chess.game import Game
+    >>> g = Game.new()
+    >>> for text in ['e2e4', 'a7a6', 'e4e5', 'd7d5']:
+    ...     g = g.updated(move_from_uci(g, text))
+    >>> move_from_uci(g, 'e5d6').type, move_from_uci(g, 'e5d6').data
+    (<MoveType.EnPassantMove: 3>, {'captured': d5})
+
+    >>> [move_from_uci(g, text) for text in ['d1d2', 'e1g1', 'g1f3q', 'd1d4', 'e5f6', 'f2e3']]
+    [None, None, None, None, None, None]
+
+    >>> from chess.fen import game_from_fen
+    >>> g = game_from_fen('4k3/1P6/8/8/8/8/8/4K3 w - - 0 1')
+    >>> move_from_uci(g, 'b7b8n').data, move_from_uci(g, 'b7b8')
+    ({'figure': n}, None)
+    """
+    frm, to, promotion = _parse_uci(game, text)
+    figure = game.board.get((frm.col, frm.row))
+    if figure == None or figure.figure_color != game.color:
+        return None
+    if figure.figure_type == FigureType.Pawn:
+        if to.is_last_row(game.color) != (promotion != None):
+            return None
+        if game._is_en_passant_capture(frm, to) and to in game.free_destinations(figure_moves(figure, frm, True)):
+            return Move(MoveType.EnPassantMove, frm, to, captured=Field(to.col, frm.row))
+        destinations = (game.capture_destinations(figure_moves(figure, frm, True)) +
+                        game.free_destinations(figure_moves(figure, frm, False)))
+    else:
+        if promotion != None:
+            return None
+        fieldss = figure_moves(figure, frm, False)
+        destinations = game.free_destinations(fieldss) + game.capture_destinations(fieldss)
+    if to not in destinations:
+        return None
+    if promotion != None:
+        return Move(MoveType.PromotionMove, frm, to, figure=promotion)
+    return Move(MoveType.RegularMove, frm, to)
+
+
+def play_uci(game, text):
+    """
+    Returns the game after a move given in the UCI coordinate notation,
+    or None if the move is not valid.
+
+    >>> from chess.game import Game
+    >>> play_uci(Game.new(), 'g1f3').last_move.to
+    f3
+
+    >>> play_uci(Game.new(), 'g1g3')
+
+    >>> play_uci(Game.new(), 'z1')
+    Traceback (most recent call last):
+    ...
+    ValueError: invalid move: 'z1'
+    """
+    frm, to, promotion = _parse_uci(game, text)
+    return game.move(frm, to, promotion)
+
+
+def move_to_san(game, next_game, valid_games=None):
+    """
+    Returns the move leading from a game to the next game in the standard
+    algebraic notation (SAN), such as 'Nf3', 'exd5', 'Rad1', 'e8=Q' or 'Qh4#'.
+    The valid next games of 'game' may be given if they are already known;
+    they are needed to disambiguate moves of figures of the same type.
+
+    >>> from chess.fen import game_from_fen
+    >>> g = game_from_fen('2k5/8/8/8/8/8/4K3/R6R w - - 0 1')
+    >>> sorted(move_to_san(g, n) for n in g.valid_games() if n.last_move.to.row == 1 and n.last_move.to.col == 4)
+    ['Kd1', 'Rad1', 'Rhd1']
+
+    >>> g = game_from_fen('rnbqkbnr/ppppp2p/5p2/6p1/4P3/3P4/PPP2PPP/RNBQKBNR w - - 0 3')
+    >>> move_to_san(g, play_uci(g, 'd1h5'))
+    'Qh5#'
+    """
+    move = next_game.last_move
+    figure = game.board[(move.frm.col, move.frm.row)]
+    capture = len(next_game.board) < len(game.board)
+    if move.type == MoveType.CastlingMove:
+        text = "O-O" if move.to.col == 7 else "O-O-O"
+    elif figure.figure_type == FigureType.Pawn:
+        text = (str(move.frm)[0] + "x" if capture else "") + str(move.to)
+        if move.type == MoveType.PromotionMove:
+            text += "=" + _san_letters[move.data['figure'].figure_type]
+    else:
+        if valid_games is None:
+            valid_games = game.valid_games()
+        others = [g.last_move.frm for g in valid_games
+                  if g.last_move.to == move.to and g.last_move.frm != move.frm and
+                  game.board[(g.last_move.frm.col, g.last_move.frm.row)] == figure]
+        disambiguation = ""
+        if others:
+            if all(frm.col != move.frm.col for frm in others):
+                disambiguation = str(move.frm)[0]
+            elif all(frm.row != move.frm.row for frm in others):
+                disambiguation = str(move.frm)[1:]
+            else:
+                disambiguation = str(move.frm)
+        text = _san_letters[figure.figure_type] + disambiguation + ("x" if capture else "") + str(move.to)
+    if next_game.is_king_under_check():
+        text += "+" if next_game.has_valid_move() else "#"
+    return text
+
+
+def play_san(game, text):
+    """
+    Returns the game after a move given in the standard algebraic notation,
+    or None if no valid move has this notation. Check, mate and annotation
+    marks ('+', '#', '!', '?') are ignored.
+
+    >>> from chess.game import Game
+    >>> play_san(Game.new(), 'Nf3').last_move.to
+    f3
+
+    >>> play_san(Game.new(), 'e4!').last_move.to
+    e4
+
+    >>> play_san(Game.new(), 'Nd4')
+    """
+    text = text.rstrip("+#!?")
+    valid_games = game.valid_games()
+    for next_game in valid_games:
+        if move_to_san(game, next_game, valid_games).rstrip("+#") == text:
+            return next_game
+    return None
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
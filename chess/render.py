@@ -0,0 +1,151 @@
+from .color import Color
+from .figure import figure_letters, figure_symbols
+
+_fen_letters = {
+    (figure_type, figure_color): (letter.upper() if figure_color == Color.White else letter.lower())
+    for (figure_type, figure_color), letter in figure_letters.items()
+}
+
+_row_prefixes = [str(row) for row in range(8,0,-1)]
+
+_columns = " abcdefgh"
+
+
+def _cells(board, letters, empty):
+    """
+    Returns the 64 one-character cells of a board, row by row from the 8th row
+    down to the 1st one, taking the figures' characters from the 'letters' table.
+    """
+    cells = [empty] * 64
+    for (col, row), figure in board.items():
+        cells[(8-row)*8 + col-1] = letters[(figure.figure_type, figure.figure_color)]
+    return cells
+
+
+def board_diagram(board, letters=figure_letters, empty="."):
+    """
+    Returns a diagram of the board, with the rows and the columns labelled,
+    using the given table of figure characters.
+
+    >>> from chess.board import starting_board
+    >>> print(board_diagram(starting_board(), figure_symbols))
+     abcdefgh
+    8♜♞♝♛♚♝♞♜8
+    7♟♟♟♟♟♟♟♟7
+    6........6
+    5........5
+    4........4
+    3........3
+    2♙♙♙♙♙♙♙♙2
+    1♖♘♗♕♔♗♘♖1
+     abcdefgh
+    """
+    cells = _cells(board, letters, empty)
+    lines = [_columns]
+    for i, prefix in enumerate(_row_prefixes):
+        lines.append(prefix + "".join(cells[i*8:i*8+8]) + prefix)
+    lines.append(_columns)
+    return "\n".join(lines)
+
+
+def board_placement(board):
+    """
+    Returns the piece placement field of the FEN notation of the board.
+
+    >>> from chess.board import starting_board
+    >>> board_placement(starting_board())
+    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR'
+    """
+    cells = _cells(board, _fen_letters, "1")
+    rows = []
+    for i in range(8):
+        row = "".join(cells[i*8:i*8+8])
+        if "11" in row:
+            for n in range(8, 1, -1):
+                row = row.replace("1" * n, str(n))
+        rows.append(row)
+    return "/".join(rows)
+
+
+_renderers = {
+    "ascii": lambda board: board_diagram(board, figure_letters),
+    "unicode": lambda board: board_diagram(board, figure_symbols),
+    "fen": board_placement,
+}
+
+
+class BoardRenderer:
+    """
+    Renders game boards in one of the modes: 'ascii' (the diagrams shown
+    by 'show_board'), 'unicode' (diagrams with unicode figure symbols)
+    or 'fen' (the piece placement field of the FEN notation).
+    Rendered boards are remembered by the Zobrist hash keys of the games,
+    so repeated positions are rendered once; the cache is emptied when it
+    holds 'cache_size' entries.
+
+    >>> from chess.game import Game
+    >>> renderer = BoardRenderer("fen")
+    >>> renderer.render(Game.new())
+    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR'
+    >>> renderer.render(Game.new()) is renderer.render(Game.new())
+    True
+    """
+
+    def __init__(self, mode="ascii", cache_size=1 << 16):
+        if mode not in _renderers:
+            raise ValueError("unknown rendering mode: {!r}".format(mode))
+        self.mode = mode
+        self.cache_size = cache_size
+        self.cache = {}
+        self._render_board = _renderers[mode]
+
+    def render(self, game):
+        text = self.cache.get(game.key)
+        if text is None:
+            text = self._render_board(game.board)
+            if len(self.cache) >= self.cache_size:
+                self.cache.clear()
+            self.cache[game.key] = text
+        return text
+
+    def write(self, games, out, separator="\n", chunk_size=256):
+        """
+        Writes the rendered boards of many games to a text stream
+        (a file or an 'io.StringIO'), each followed by the separator.
+        The boards are written in chunks, with a single write call per chunk.
+        Returns the number of written boards.
+
+        >>> import io
+        >>> from chess.game import Game
+        >>> out = io.StringIO()
+        >>> BoardRenderer("fen").write([Game.new(), Game.new().valid_games()[0]], out)
+        2
+        >>> print(out.getvalue(), end="")
+        rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR
+        rnbqkbnr/pppppppp/8/8/8/2N5/PPPPPPPP/R1BQKBNR
+        """
+        count = 0
+        chunk = []
+        for game in games:
+            chunk.append(self.render(game))
+            chunk.append(separator)
+            count += 1
+            if len(chunk) >= 2 * chunk_size:
+                out.write("".join(chunk))
+                chunk = []
+        if chunk:
+            out.write("".join(chunk))
+        return count
+
+    def export(self, games, path, separator="\n", buffer_size=1 << 20):
+        """
+        Writes the rendered boards of many games to a file, through a large buffer.
+        Returns the number of written boards.
+        """
+        with open(path, "w", encoding="utf-8", buffering=buffer_size) as out:
+            return self.write(games, out, separator)
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
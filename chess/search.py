@@ -0,0 +1,377 @@
+import asyncio
+import time
+from . import stats
+from .evaluation import evaluate
+from .notation import move_to_uci, play_uci
+
+# The score of a checkmate; a mate in n plies is scored MATE - n.
+MATE = 100000
+
+_MATE_BOUND = MATE - 1000
+
+_EXACT, _LOWER, _UPPER = 0, 1, 2
+
+
+class SearchStopped(Exception):
+    """
+    Raised inside the search when its node or time limit is reached.
+    """
+
+
+class SearchResult:
+    """
+    The result of a search: the best move (in the UCI notation), its score
+    (in centipawns, from the point of view of the player to move), the depth
+    of the last completed iteration, the principal variation, and
+    the number of visited nodes.
+    """
+
+    def __init__(self, move, score, depth, pv, nodes, seconds):
+        self.move = move
+        self.score = score
+        self.depth = depth
+        self.pv = pv
+        self.nodes = nodes
+        self.seconds = seconds
+
+    def __repr__(self):
+        return "SearchResult(move={!r}, score={}, depth={}, pv={}, nodes={})".format(
+            self.move, self.score, self.depth, self.pv, self.nodes)
+
+
+class AnalysisLine:
+    """
+    One line of an analysis: the depth, the rank of the line (1 for the best one),
+    its score (in centipawns, from the point of view of the player to move),
+    its principal variation (moves in the UCI notation), and the number of nodes
+    searched so far with the search speed in nodes per second.
+    """
+
+    def __init__(self, depth, multipv, score, pv, nodes, nps):
+        self.depth = depth
+        self.multipv = multipv
+        self.score = score
+        self.pv = pv
+        self.nodes = nodes
+        self.nps = nps
+
+    def __repr__(self):
+        return "AnalysisLine(depth={}, multipv={}, score={}, pv={})".format(
+            self.depth, self.multipv, self.score, self.pv)
+
+
+class Search:
+    """
+    An iterative deepening alpha-beta search with a transposition table
+    and a quiescence search of the captures which do not lose material
+    according to the static exchange evaluation.
+    The search may be limited by depth, by the number of nodes and by time.
+    Only the time limit makes the results depend on the speed of the machine:
+    searches limited by depth or nodes are deterministic.
+
+    >>> from chess.fen import game_from_fen
+    >>> Search(max_depth=2).run(game_from_fen('6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1')).move
+    'a1a8'
+    """
+
+    def __init__(self, max_depth=64, nodes=None, movetime=None, quiescence=True,
+                 tt_size=1 << 18, evaluate=evaluate):
+        self.max_depth = max_depth
+        self.node_limit = nodes
+        self.movetime = movetime
+        self.quiescence = quiescence
+        self.tt_size = tt_size
+        self.evaluate = evaluate
+        self.tt = {}
+        self.nodes = 0
+        self._deadline = None
+        self._stop_requested = False
+
+    def stop(self):
+        """
+        Makes the search stop as soon as possible. It may be called from another thread.
+        """
+        self._stop_requested = True
+
+    def _visit(self):
+        self.nodes += 1
+        if self._stop_requested:
+            raise SearchStopped()
+        if self.node_limit is not None and self.nodes > self.node_limit:
+            raise SearchStopped()
+        if self._deadline is not None and self.nodes & 255 == 0 and time.perf_counter() > self._deadline:
+            raise SearchStopped()
+
+    def _probe(self, key):
+        if stats.active is not None:
+            stats.active.count("tt_probes")
+        return self.tt.get(key)
+
+    def _store(self, key, depth, score, flag, move):
+        if len(self.tt) >= self.tt_size and key not in self.tt:
+            self.tt.clear()
+        self.tt[key] = (depth, score, flag, move)
+
+    def _valid_games(self, game, best_move=None):
+        """
+        Returns the valid next games in the search order: the best move
+        remembered in the transposition table first, then the captures
+        from the best to the worst according to the static exchange evaluation,
+        then the other moves in the order in which they were generated.
+        """
+        games = game.valid_games()
+        captures = []
+        others = []
+        first = []
+        for g in games:
+            if best_move is not None and move_to_uci(g.last_move) == best_move:
+                first.append(g)
+            elif len(g.board) < len(game.board):
+                captures.append((-game.see(g.last_move), len(captures), g))
+            else:
+                others.append(g)
+        captures.sort(key=lambda item: item[:2])
+        return first + [g for _, _, g in captures] + others
+
+    def _is_draw(self, game, ply):
+        return ply > 0 and (game.repetitions.get(game.key, 0) >= 2 or
+                            game.halfmove_clock >= 100 or
+                            game._is_insufficient_material())
+
+    def _quiesce(self, game, alpha, beta, ply):
+        self._visit()
+        stand_pat = self.evaluate(game)
+        if stand_pat >= beta:
+            return stand_pat
+        alpha = max(alpha, stand_pat)
+        for g in game.next_games():
+            if len(g.board) < len(game.board) and game.see(g.last_move) >= 0 and not g.is_other_king_under_check():
+                score = -self._quiesce(g, -beta, -alpha, ply + 1)
+                if score >= beta:
+                    return score
+                alpha = max(alpha, score)
+        return alpha
+
+    def negamax(self, game, depth, alpha, beta, ply):
+        """
+        Returns the score of a game position searched to the given depth
+        within the (alpha, beta) window.
+        """
+        if self._is_draw(game, ply):
+            self._visit()
+            return 0
+        if depth <= 0:
+            if self.quiescence:
+                return self._quiesce(game, alpha, beta, ply)
+            self._visit()
+            return self.evaluate(game)
+        self._visit()
+        entry = self._probe(game.key)
+        best_move = None
+        if entry is not None:
+            entry_depth, score, flag, best_move = entry
+            if entry_depth >= depth and ply > 0:
+                score = _score_from_tt(score, ply)
+                if (flag == _EXACT or (flag == _LOWER and score >= beta) or
+                        (flag == _UPPER and score <= alpha)):
+                    if stats.active is not None:
+                        stats.active.count("tt_cutoffs")
+                    return score
+        games = self._valid_games(game, best_move)
+        if not games:
+            return -(MATE - ply) if game.is_king_under_check() else 0
+        original_alpha = alpha
+        best_score = -MATE - 1
+        for g in games:
+            score = -self.negamax(g, depth - 1, -beta, -alpha, ply + 1)
+            if score > best_score:
+                best_score = score
+                best_move = move_to_uci(g.last_move)
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                break
+        if best_score >= beta:
+            flag = _LOWER
+        elif best_score > original_alpha:
+            flag = _EXACT
+        else:
+            flag = _UPPER
+        self._store(game.key, depth, _score_to_tt(best_score, ply), flag, best_move)
+        return best_score
+
+    def principal_variation(self, game, first_move, depth):
+        """
+        Returns the principal variation starting with the given move,
+        following the best moves remembered in the transposition table.
+        """
+        pv = [first_move]
+        game = play_uci(game, first_move)
+        seen = {game.key}
+        while game is not None and len(pv) < depth:
+            entry = self.tt.get(game.key)
+            if entry is None or entry[3] is None:
+                break
+            game = play_uci(game, entry[3])
+            if game is None or game.key in seen:
+                break
+            seen.add(game.key)
+            pv.append(entry[3])
+        return pv
+
+    def root(self, game, depth, excluded=()):
+        """
+        Searches the root position to the given depth and returns
+        the best move (in the UCI notation) and its score.
+        """
+        alpha, beta = -MATE - 1, MATE + 1
+        best_move, best_score = None, -MATE - 1
+        entry = self.tt.get(game.key)
+        for g in self._valid_games(game, entry[3] if entry is not None else None):
+            move = move_to_uci(g.last_move)
+            if move in excluded:
+                continue
+            score = -self.negamax(g, depth - 1, -beta, -alpha, 1)
+            if score > best_score:
+                best_move, best_score = move, score
+                alpha = max(alpha, score)
+        if best_move is not None and not excluded:
+            self._store(game.key, depth, _score_to_tt(best_score, 0), _EXACT, best_move)
+        return best_move, best_score
+
+    def run(self, game, on_iteration=None):
+        """
+        Searches a game position with iterative deepening until the depth,
+        node or time limit is reached, and returns the result of the last
+        completed iteration. If no iteration was completed, the first move
+        in the search order is returned. 'on_iteration' is called
+        with the result of every completed iteration.
+        """
+        start = self._start()
+        result = None
+        try:
+            for depth in range(1, self.max_depth + 1):
+                move, score = self.root(game, depth)
+                if move is None:
+                    break
+                result = SearchResult(move, score, depth, self.principal_variation(game, move, depth),
+                                      self.nodes, time.perf_counter() - start)
+                if on_iteration is not None:
+                    on_iteration(result)
+                if abs(score) >= _MATE_BOUND:
+                    break
+        except SearchStopped:
+            pass
+        if result is None:
+            games = self._valid_games(game)
+            move = move_to_uci(games[0].last_move) if games else None
+            result = SearchResult(move, None, 0, [move] if move else [], self.nodes,
+                                  time.perf_counter() - start)
+        if stats.active is not None:
+            stats.active.count("nodes", self.nodes)
+        return result
+
+    def _start(self):
+        start = time.perf_counter()
+        self.nodes = 0
+        self._deadline = start + self.movetime if self.movetime is not None else None
+        self._stop_requested = False
+        return start
+
+    def analyse(self, game, multipv=1, on_update=None):
+        """
+        Analyses a game position with iterative deepening, finding at every depth
+        the 'multipv' best moves: each next line is searched excluding the root moves
+        of the lines already found, reusing the transposition table filled by
+        the previous searches. 'on_update' is called with every line as soon as
+        it is found. Returns the lines of the last completed depth.
+
+        >>> from chess.fen import game_from_fen
+        >>> lines = Search(max_depth=2).analyse(game_from_fen('6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1'), 3)
+        >>> [(line.multipv, line.pv[0]) for line in lines]
+        [(1, 'a1a8'), (2, 'a1a5'), (3, 'a1b1')]
+        >>> lines[0].score == MATE - 1
+        True
+        """
+        start = self._start()
+        lines = []
+        try:
+            for depth in range(1, self.max_depth + 1):
+                depth_lines = []
+                excluded = []
+                for rank in range(1, multipv + 1):
+                    move, score = self.root(game, depth, excluded)
+                    if move is None:
+                        break
+                    excluded.append(move)
+                    seconds = time.perf_counter() - start
+                    line = AnalysisLine(depth, rank, score, self.principal_variation(game, move, depth),
+                                        self.nodes, self.nodes / seconds if seconds > 0 else 0.0)
+                    depth_lines.append(line)
+                    if on_update is not None:
+                        on_update(line)
+                if not depth_lines:
+                    break
+                lines = depth_lines
+        except SearchStopped:
+            pass
+        if stats.active is not None:
+            stats.active.count("nodes", self.nodes)
+        return lines
+
+
+async def stream_analysis(game, multipv=1, **options):
+    """
+    Analyses a game position in a background thread (see 'Search.analyse'),
+    yielding the lines as soon as they are found, from the shallowest depth on.
+    'options' are the options of 'Search', such as 'movetime' or 'nodes'.
+    Leaving the iteration early stops the search.
+
+    >>> from chess.game import Game
+    >>> async def first_lines():
+    ...     return [(line.depth, line.multipv) async for line in stream_analysis(Game.new(), 2, max_depth=2)]
+    >>> asyncio.run(first_lines())
+    [(1, 1), (1, 2), (2, 1), (2, 2)]
+    """
+    search = Search(**options)
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    finished = object()
+
+    def run():
+        try:
+            search.analyse(game, multipv, lambda line: loop.call_soon_threadsafe(queue.put_nowait, line))
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, finished)
+
+    future = loop.run_in_executor(None, run)
+    try:
+        while True:
+            line = await queue.get()
+            if line is finished:
+                break
+            yield line
+    finally:
+        search.stop()
+        await future
+
+
+def _score_to_tt(score, ply):
+    if score >= _MATE_BOUND:
+        return score + ply
+    elif score <= -_MATE_BOUND:
+        return score - ply
+    return score
+
+
+def _score_from_tt(score, ply):
+    if score >= _MATE_BOUND:
+        return score - ply
+    elif score <= -_MATE_BOUND:
+        return score + ply
+    return score
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
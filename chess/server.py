@@ -0,0 +1,246 @@
+import argparse
+import asyncio
+import itertools
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from .color import Color
+from .fen import game_from_fen, game_to_fen, starting_fen
+from .notation import move_to_uci, play_uci
+
+
+def apply_move(fen, repetitions, text):
+    """
+    Validates a move in a position given in the FEN notation and returns
+    the result of the move, as sent to the clients.
+    This is the CPU-heavy part of handling a move: it runs in a worker
+    process, so it only takes and returns plain, picklable values.
+
+    >>> result = apply_move(starting_fen, None, 'e2e4')
+    >>> result['fen'], result['status']
+    ('rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b - e3 0 1', 'ongoing')
+
+    >>> apply_move(starting_fen, None, 'e2e5')
+    {'ok': False, 'error': 'illegal move: e2e5'}
+    """
+    game = game_from_fen(fen, repetitions)
+    fields = fen.split()
+    fullmove_number = int(fields[5]) if len(fields) > 5 else 1
+    try:
+        game = play_uci(game, text)
+    except ValueError as e:
+        return {"ok": False, "error": str(e)}
+    if game == None:
+        return {"ok": False, "error": "illegal move: " + text}
+    if game.color == Color.White:
+        fullmove_number += 1
+    result = {"ok": True, "move": move_to_uci(game.last_move), "fen": game_to_fen(game, fullmove_number),
+              "repetitions": game.repetitions}
+    winner = game.winner()
+    draw_reason = game.draw_reason() if winner == None else None
+    if winner != None:
+        result.update(status="checkmate", winner=winner.name)
+    elif draw_reason != None:
+        result.update(status="draw", reason=draw_reason.name)
+    else:
+        result.update(status="ongoing")
+    return result
+
+
+class GameSession:
+    """
+    A live game kept by the server: the current position in the FEN notation,
+    the log of moves in the UCI notation, the position repetition counts
+    and the connections watching the game.
+    """
+
+    __slots__ = ("fen", "moves", "repetitions", "status", "watchers", "lock")
+
+    def __init__(self, fen):
+        self.fen = fen
+        self.moves = []
+        self.repetitions = None
+        self.status = "ongoing"
+        self.watchers = None
+        self.lock = None
+
+
+class GameServer:
+    """
+    Hosts many concurrent games, accepting requests from clients connected
+    through TCP or Unix sockets. Every request and response is a JSON object
+    on a single line. The requests are:
+
+    {"op": "new", "fen": ...}                 starts a game (the FEN is optional)
+    {"op": "move", "game": id, "move": "e2e4"}  makes a move
+    {"op": "show", "game": id}                returns the position and the moves
+    {"op": "watch", "game": id}               pushes the moves of a game to the connection
+    {"op": "close", "game": id}               forgets a game
+
+    The optional "id" of a request is copied to its response.
+    Moves are validated in the worker processes of 'executor'
+    (or in the event loop thread if it is None).
+    """
+
+    def __init__(self, executor=None):
+        self.executor = executor
+        self.games = {}
+        self._ids = itertools.count(1)
+
+    async def _run(self, function, *args):
+        if self.executor is None:
+            return function(*args)
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    def _game_id(self, request):
+        game_id = request.get("game")
+        if not isinstance(game_id, int) or isinstance(game_id, bool):
+            raise ValueError("invalid game: {!r}".format(game_id))
+        return game_id
+
+    def _session(self, request):
+        session = self.games.get(self._game_id(request))
+        if session is None:
+            raise KeyError("unknown game: {!r}".format(request.get("game")))
+        return session
+
+    async def handle_request(self, request, writer=None):
+        """
+        Handles a request and returns its response.
+
+        >>> server = GameServer()
+        >>> asyncio.run(server.handle_request({"op": "new"}))
+        {'ok': True, 'game': 1, 'fen': 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w - - 0 1'}
+
+        >>> asyncio.run(server.handle_request({"op": "move", "game": 1, "move": "g1f3"}))['fen']
+        'rnbqkbnr/pppppppp/8/8/8/5N2/PPPPPPPP/RNBQKB1R b - - 1 1'
+
+        >>> asyncio.run(server.handle_request({"op": "move", "game": 2, "move": "g1f3"}))
+        {'ok': False, 'error': 'unknown game: 2'}
+
+        >>> asyncio.run(server.handle_request({"op": "move", "game": [1], "move": "g1f3"}))
+        {'ok': False, 'error': 'invalid game: [1]'}
+
+        >>> asyncio.run(server.handle_request({"op": "show", "game": True}))
+        {'ok': False, 'error': 'invalid game: True'}
+
+        >>> asyncio.run(server.handle_request({"op": "new", "fen": "8/8/8/8/8/2k5/1q6/K7 w - - 0 x"}))
+        {'ok': False, 'error': "invalid FEN full move number: 'x'"}
+
+        >>> asyncio.run(server.handle_request({"op": "new", "fen": "8/8/8/8/8/8/8/8 w - - 0 1"}))
+        {'ok': False, 'error': 'invalid FEN position: every side needs exactly one King'}
+        """
+        op = request.get("op")
+        try:
+            if op == "new":
+                fen = request.get("fen") or starting_fen
+                if not isinstance(fen, str):
+                    raise ValueError("invalid FEN: {!r}".format(fen))
+                game_from_fen(fen)
+                game_id = next(self._ids)
+                self.games[game_id] = GameSession(fen)
+                return {"ok": True, "game": game_id, "fen": fen}
+            elif op == "move":
+                return await self._move(request)
+            elif op == "show":
+                session = self._session(request)
+                return {"ok": True, "game": request["game"], "fen": session.fen,
+                        "moves": session.moves, "status": session.status}
+            elif op == "watch":
+                session = self._session(request)
+                if writer is not None:
+                    if session.watchers is None:
+                        session.watchers = set()
+                    session.watchers.add(writer)
+                return {"ok": True, "game": request["game"]}
+            elif op == "close":
+                self.games.pop(self._game_id(request), None)
+                return {"ok": True}
+            else:
+                return {"ok": False, "error": "unknown op: {!r}".format(op)}
+        except (KeyError, TypeError, ValueError) as e:
+            return {"ok": False, "error": e.args[0] if e.args else str(e)}
+
+    async def _move(self, request):
+        session = self._session(request)
+        if session.lock is None:
+            session.lock = asyncio.Lock()
+        async with session.lock:
+            if session.status != "ongoing":
+                return {"ok": False, "error": "game finished: " + session.status}
+            result = await self._run(apply_move, session.fen, session.repetitions, str(request.get("move")))
+            if not result["ok"]:
+                return result
+            session.fen = result["fen"]
+            session.repetitions = result.pop("repetitions")
+            session.moves.append(result["move"])
+            session.status = result["status"]
+        result["game"] = request["game"]
+        if session.watchers:
+            self._push(session, dict(result, event="moved"))
+        return result
+
+    def _push(self, session, message):
+        line = (json.dumps(message) + "\n").encode()
+        for writer in list(session.watchers):
+            if writer.is_closing():
+                session.watchers.discard(writer)
+            else:
+                writer.write(line)
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("request is not an object")
+                except ValueError as e:
+                    response = {"ok": False, "error": "invalid request: " + str(e)}
+                else:
+                    response = await self.handle_request(request, writer)
+                    if "id" in request:
+                        response["id"] = request["id"]
+                writer.write((json.dumps(response) + "\n").encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=7777, path=None):
+        """
+        Serves clients on a TCP port, or on a Unix socket if 'path' is given.
+        """
+        if path is not None:
+            server = await asyncio.start_unix_server(self.handle_connection, path)
+        else:
+            server = await asyncio.start_server(self.handle_connection, host, port)
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Chess game server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7777)
+    parser.add_argument("--unix", metavar="PATH", help="listen on a Unix socket instead of TCP")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes validating moves (0 validates in the event loop)")
+    args = parser.parse_args(argv)
+    executor = None if args.workers == 0 else ProcessPoolExecutor(args.workers)
+    try:
+        asyncio.run(GameServer(executor).serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+import time
+from contextlib import contextmanager, nullcontext
+
+
+class Stats:
+    """
+    Counters and timers collected while the instrumentation is enabled.
+    Counters are identified by names, such as 'games' or 'moves.Knight',
+    timers accumulate the time spent in the named phases.
+
+    >>> s = Stats()
+    >>> s.count('games')
+    >>> s.count('games', 2)
+    >>> s.counters
+    {'games': 3}
+    """
+
+    def __init__(self):
+        self.counters = {}
+        self.timers = {}
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    @contextmanager
+    def timer(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timers[name] = self.timers.get(name, 0.0) + time.perf_counter() - start
+
+    def as_dict(self):
+        return {"counters": dict(sorted(self.counters.items())),
+                "timers": dict(sorted(self.timers.items()))}
+
+    def __str__(self):
+        """
+        >>> s = Stats()
+        >>> s.count('check_tests', 12)
+        >>> print(s)
+        check_tests                         12
+        """
+        lines = ["{:<30} {:>7}".format(name, n) for name, n in sorted(self.counters.items())]
+        lines += ["{:<30} {:>10.3f}s".format(name, t) for name, t in sorted(self.timers.items())]
+        return "\n".join(lines)
+
+
+# The stats object collecting the data, or None if the instrumentation is disabled.
+# Instrumented code checks it before counting anything, so that the only cost
+# of the disabled instrumentation is that check.
+active = None
+
+_no_timer = nullcontext()
+
+
+def enable(stats=None):
+    """
+    Enables the instrumentation and returns the stats object collecting the data.
+
+    >>> s = enable()
+    >>> timer('search') is _no_timer
+    False
+    >>> disable() is s, timer('search') is _no_timer
+    (True, True)
+    """
+    global active
+    active = Stats() if stats is None else stats
+    return active
+
+
+def disable():
+    """
+    Disables the instrumentation and returns the stats object with the collected data.
+    """
+    global active
+    stats, active = active, None
+    return stats
+
+
+def timer(name):
+    """
+    Returns a context manager measuring the time spent in the named phase,
+    which does nothing if the instrumentation is disabled.
+    """
+    if active is None:
+        return _no_timer
+    else:
+        return active.timer(name)
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,357 @@
+import argparse
+import datetime
+import itertools
+import json
+import math
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from .color import Color
+from .fen import game_from_fen, starting_fen
+from .notation import move_to_san, play_uci
+from .game import DrawReason
+from .search import Search
+
+# The reasons why a game ended, written as PGN comments after the moves.
+draw_reason_texts = {
+    DrawReason.Stalemate: "stalemate",
+    DrawReason.InsufficientMaterial: "insufficient material",
+    DrawReason.ThreefoldRepetition: "threefold repetition",
+    DrawReason.FiftyMoveRule: "fifty-move rule",
+}
+
+
+class Engine:
+    """
+    An engine configuration taking part in a tournament: a name and
+    the limits of the search made for every move.
+    Engines limited by depth or nodes only play deterministically.
+
+    >>> Engine.parse('name=fast,nodes=500,quiescence=0')
+    Engine(name='fast', depth=64, nodes=500, movetime=None, quiescence=False)
+    """
+
+    def __init__(self, name, depth=64, nodes=None, movetime=None, quiescence=True):
+        self.name = name
+        self.depth = depth
+        self.nodes = nodes
+        self.movetime = movetime
+        self.quiescence = quiescence
+
+    def __repr__(self):
+        return "Engine(name={!r}, depth={}, nodes={}, movetime={}, quiescence={})".format(
+            self.name, self.depth, self.nodes, self.movetime, self.quiescence)
+
+    def new_search(self):
+        return Search(max_depth=self.depth, nodes=self.nodes, movetime=self.movetime,
+                      quiescence=self.quiescence)
+
+    @staticmethod
+    def parse(text):
+        """
+        Returns the engine described by a comma separated list
+        of key=value settings (name, depth, nodes, movetime, quiescence).
+        """
+        settings = dict(item.split("=", 1) for item in text.split(","))
+        unknown = set(settings) - {"name", "depth", "nodes", "movetime", "quiescence"}
+        if unknown:
+            raise ValueError("unknown engine settings: " + ", ".join(sorted(unknown)))
+        return Engine(settings.get("name", text),
+                      int(settings.get("depth", 64)),
+                      int(settings["nodes"]) if "nodes" in settings else None,
+                      float(settings["movetime"]) if "movetime" in settings else None,
+                      settings.get("quiescence", "1") not in ("0", "false", "no"))
+
+
+def parse_opening(line):
+    """
+    Returns an opening given as a FEN position or as a sequence of moves
+    in the UCI notation played from the initial position,
+    as a pair of a FEN position and a list of moves.
+
+    >>> parse_opening('e2e4 e7e5')
+    ('rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w - - 0 1', ['e2e4', 'e7e5'])
+
+    >>> parse_opening('8/8/8/4k3/8/8/4P3/4K3 w - - 0 1')
+    ('8/8/8/4k3/8/8/4P3/4K3 w - - 0 1', [])
+    """
+    line = line.strip()
+    if "/" in line:
+        return line, []
+    else:
+        return starting_fen, line.split()
+
+
+def play_game(white, black, opening, max_plies=300, round_number=1):
+    """
+    Plays a game between two engines from an opening and returns its record.
+    The game is adjudicated when it is finished according to 'Game.is_game_finished'
+    (checkmate, stalemate, insufficient material, threefold repetition, fifty moves rule)
+    or drawn when 'max_plies' plies were played. The termination is the value
+    of the PGN Termination tag ('normal' or 'adjudication'), the reason tells
+    why the game ended.
+
+    >>> record = play_game(Engine('a', depth=2), Engine('b', depth=2), ('6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1', []))
+    >>> record['moves'], record['result'], record['termination'], record['reason']
+    (['Ra8#'], '1-0', 'normal', 'checkmate')
+    """
+    fen, opening_moves = opening
+    game = game_from_fen(fen)
+    searches = {Color.White: white.new_search(), Color.Black: black.new_search()}
+    moves = []
+    for uci in opening_moves:
+        next_game = play_uci(game, uci)
+        if next_game is None:
+            raise ValueError("invalid opening move: " + uci)
+        moves.append(move_to_san(game, next_game))
+        game = next_game
+    while True:
+        winner = game.winner()
+        draw_reason = game.draw_reason() if winner is None else None
+        if winner is not None:
+            result, termination, reason = ("1-0" if winner == Color.White else "0-1"), "normal", "checkmate"
+            break
+        elif draw_reason is not None:
+            result, termination, reason = "1/2-1/2", "normal", draw_reason_texts[draw_reason]
+            break
+        elif len(moves) >= max_plies:
+            result, termination, reason = "1/2-1/2", "adjudication", "move limit"
+            break
+        search_result = searches[game.color].run(game)
+        next_game = play_uci(game, search_result.move)
+        moves.append(move_to_san(game, next_game))
+        game = next_game
+    return {"round": round_number, "white": white.name, "black": black.name, "fen": fen,
+            "moves": moves, "result": result, "termination": termination,
+            "reason": reason}
+
+
+def _play_task(task):
+    return play_game(*task)
+
+
+def record_to_pgn(record, event="Engine tournament", date=None):
+    """
+    Returns the PGN notation of a game record returned by 'play_game'.
+    The reason why the game ended is written as a comment after the moves.
+
+    >>> print(record_to_pgn({"round": 1, "white": "a", "black": "b", "fen": starting_fen,
+    ...                      "moves": ["f3", "e5", "g4", "Qh4#"], "result": "0-1",
+    ...                      "termination": "normal", "reason": "checkmate"}, date="2018.04.01"))
+    [Event "Engine tournament"]
+    [Site "?"]
+    [Date "2018.04.01"]
+    [Round "1"]
+    [White "a"]
+    [Black "b"]
+    [Result "0-1"]
+    [Termination "normal"]
+    <BLANKLINE>
+    1. f3 e5 2. g4 Qh4# {checkmate} 0-1
+    <BLANKLINE>
+    """
+    if date is None:
+        date = datetime.date.today().strftime("%Y.%m.%d")
+    headers = [("Event", event), ("Site", "?"), ("Date", date), ("Round", str(record["round"])),
+               ("White", record["white"]), ("Black", record["black"]), ("Result", record["result"])]
+    if record["fen"] != starting_fen:
+        headers += [("SetUp", "1"), ("FEN", record["fen"])]
+    headers.append(("Termination", record["termination"]))
+    fields = record["fen"].split()
+    black_first = len(fields) > 1 and fields[1] == "b"
+    number = int(fields[5]) if len(fields) > 5 else 1
+    tokens = []
+    for ply, san in enumerate(record["moves"]):
+        if (ply + black_first) % 2 == 0:
+            tokens.append("{}.".format(number))
+        elif ply == 0:
+            tokens.append("{}...".format(number))
+        tokens.append(san)
+        if (ply + black_first) % 2 == 1:
+            number += 1
+    if record.get("reason"):
+        tokens.append("{" + record["reason"] + "}")
+    tokens.append(record["result"])
+    lines = []
+    line = ""
+    for token in tokens:
+        if line and len(line) + 1 + len(token) > 79:
+            lines.append(line)
+            line = token
+        else:
+            line = line + " " + token if line else token
+    lines.append(line)
+    return ("".join('[{} "{}"]\n'.format(name, value) for name, value in headers) +
+            "\n" + "\n".join(lines) + "\n")
+
+
+def expected_score(elo):
+    """
+    Returns the expected score of a player stronger by 'elo' Elo points.
+
+    >>> expected_score(0)
+    0.5
+    """
+    return 1 / (1 + 10 ** (-elo / 400))
+
+
+def elo_difference(score):
+    """
+    Returns the Elo difference corresponding to a score between 0 and 1,
+    or None for the scores of 0 and 1, for which it is unbounded.
+
+    >>> round(elo_difference(0.75), 1)
+    190.8
+
+    >>> elo_difference(1.0)
+    """
+    if score <= 0 or score >= 1:
+        return None
+    return -400 * math.log10(1 / score - 1)
+
+
+def match_summary(wins, draws, losses, elo0=0.0, elo1=5.0, alpha=0.05, beta=0.05):
+    """
+    Returns the summary of a match from the point of view of the first player:
+    the score, the Elo difference with its 95% confidence interval,
+    the likelihood of superiority and the log-likelihood ratio of the sequential
+    probability ratio test of the hypotheses elo = elo0 (H0) and elo = elo1 (H1),
+    with its bounds and verdict. The Elo difference and its error are None
+    when they are unbounded, e.g. after a match won without a draw or loss.
+
+    >>> s = match_summary(600, 200, 200)
+    >>> round(s["elo"], 1), s["sprt"]["verdict"]
+    (147.2, 'H1')
+
+    >>> match_summary(0, 0, 0)["sprt"]["verdict"]
+    'continue'
+
+    >>> s = match_summary(2, 0, 0)
+    >>> s["score"], s["elo"], s["elo_error"]
+    (1.0, None, None)
+    """
+    games = wins + draws + losses
+    lower = math.log(beta / (1 - alpha))
+    upper = math.log((1 - beta) / alpha)
+    summary = {"games": games, "wins": wins, "draws": draws, "losses": losses}
+    if games == 0:
+        summary.update(score=None, elo=None, elo_error=None, los=None,
+                       sprt={"llr": 0.0, "lower": lower, "upper": upper, "verdict": "continue"})
+        return summary
+    score = (wins + draws / 2) / games
+    variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / games
+    error = 1.959964 * math.sqrt(variance / games)
+    elo = elo_difference(score)
+    elo_upper, elo_lower = elo_difference(score + error), elo_difference(score - error)
+    elo_error = (elo_upper - elo_lower) / 2 if elo_upper is not None and elo_lower is not None else None
+    los = 0.5 * (1 + math.erf((wins - losses) / math.sqrt(2 * (wins + losses)))) if wins + losses else 0.5
+    if variance > 0:
+        s0, s1 = expected_score(elo0), expected_score(elo1)
+        llr = (s1 - s0) * (2 * score - s0 - s1) / (2 * variance / games)
+    else:
+        llr = 0.0
+    verdict = "H1" if llr >= upper else "H0" if llr <= lower else "continue"
+    summary.update(score=score, elo=elo, elo_error=elo_error, los=los,
+                   sprt={"llr": llr, "lower": lower, "upper": upper, "elo0": elo0, "elo1": elo1,
+                         "verdict": verdict})
+    return summary
+
+
+def schedule(engines, openings, rounds=1):
+    """
+    Returns the games of a tournament, as (white, black, opening, round) tuples:
+    every pair of engines plays every opening twice, with swapped colors.
+
+    >>> [(w.name, b.name, r) for w, b, _, r in schedule([Engine('a'), Engine('b')], [parse_opening('')])]
+    [('a', 'b', 1), ('b', 'a', 1)]
+    """
+    return [(white, black, opening, round_number)
+            for round_number in range(1, rounds + 1)
+            for opening in openings
+            for first, second in itertools.combinations(engines, 2)
+            for white, black in ((first, second), (second, first))]
+
+
+def run_tournament(engines, openings, pgn=None, rounds=1, max_plies=300, workers=None,
+                   elo0=0.0, elo1=5.0):
+    """
+    Plays a tournament in a pool of worker processes (or in the current
+    process if 'workers' is 0), writing every game to the 'pgn' stream
+    as soon as it and all the games scheduled before it are finished,
+    and returns the match summaries of all the pairs of engines.
+    The order of the games does not depend on the number of workers.
+    """
+    tasks = [(white, black, opening, max_plies, round_number)
+             for white, black, opening, round_number in schedule(engines, openings, rounds)]
+    scores = {}
+    executor = None if workers == 0 else ProcessPoolExecutor(workers)
+    try:
+        records = map(_play_task, tasks) if executor is None else executor.map(_play_task, tasks)
+        for record in records:
+            if pgn is not None:
+                pgn.write(record_to_pgn(record) + "\n")
+                pgn.flush()
+            if record["white"] < record["black"]:
+                pair, first_won = (record["white"], record["black"]), "1-0"
+            else:
+                pair, first_won = (record["black"], record["white"]), "0-1"
+            wins, draws, losses = scores.get(pair, (0, 0, 0))
+            if record["result"] == "1/2-1/2":
+                draws += 1
+            elif record["result"] == first_won:
+                wins += 1
+            else:
+                losses += 1
+            scores[pair] = (wins, draws, losses)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return {"{} vs {}".format(*pair): match_summary(*result, elo0=elo0, elo1=elo1)
+            for pair, result in sorted(scores.items())}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Self-play tournament between engine configurations.")
+    parser.add_argument("--engine", action="append", required=True, metavar="SETTINGS",
+                        help="engine settings, e.g. name=n500,nodes=500 (at least two)")
+    parser.add_argument("--openings", metavar="FILE",
+                        help="file with one opening per line: a FEN or UCI moves from the initial position")
+    parser.add_argument("--rounds", type=int, default=1)
+    parser.add_argument("--max-plies", type=int, default=300)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--pgn", metavar="FILE", help="write the games to FILE (default: standard output)")
+    parser.add_argument("--summary", metavar="FILE", help="write the match summaries as JSON to FILE")
+    parser.add_argument("--elo0", type=float, default=0.0)
+    parser.add_argument("--elo1", type=float, default=5.0)
+    args = parser.parse_args(argv)
+    engines = [Engine.parse(text) for text in args.engine]
+    if len(engines) < 2:
+        parser.error("at least two engines are needed")
+    if args.openings:
+        with open(args.openings) as f:
+            openings = [parse_opening(line) for line in f if line.strip() and not line.startswith("#")]
+    else:
+        openings = [parse_opening("")]
+    pgn = open(args.pgn, "w") if args.pgn else sys.stdout
+    try:
+        summaries = run_tournament(engines, openings, pgn, args.rounds, args.max_plies, args.workers,
+                                   args.elo0, args.elo1)
+    finally:
+        if args.pgn:
+            pgn.close()
+    for pair, s in summaries.items():
+        if s["games"]:
+            print("{}: +{} ={} -{}  score {:.3f}  elo {} +/- {}  LOS {:.3f}  "
+                  "LLR {:.2f} [{:.2f}, {:.2f}] {}".format(
+                      pair, s["wins"], s["draws"], s["losses"], s["score"],
+                      "?" if s["elo"] is None else "{:+.1f}".format(s["elo"]),
+                      "?" if s["elo_error"] is None else "{:.1f}".format(s["elo_error"]),
+                      s["los"], s["sprt"]["llr"], s["sprt"]["lower"], s["sprt"]["upper"],
+                      s["sprt"]["verdict"]), file=sys.stderr)
+    if args.summary:
+        with open(args.summary, "w") as f:
+            json.dump(summaries, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
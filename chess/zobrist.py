@@ -0,0 +1,72 @@
+from random import Random
+from .color import Color
+from .figure import Figure, FigureType
+
+_random = Random(20180401)
+
+figure_keys = {
+    (col, row, figure_type, figure_color): _random.getrandbits(64)
+    for col in range(1,9)
+    for row in range(1,9)
+    for figure_type in FigureType
+    for figure_color in Color
+}
+
+black_to_move_key = _random.getrandbits(64)
+
+
+def figure_key(field_key, figure):
+    """
+    Returns the hash key of a figure standing on the given field.
+    The field is given as a (col, row) pair, as used by the board.
+
+    >>> figure_key((1,1), Figure(FigureType.Rook, Color.White)) == figure_key((1,1), Figure(FigureType.Rook, Color.Black))
+    False
+    """
+    return figure_keys[(field_key[0], field_key[1], figure.figure_type, figure.figure_color)]
+
+
+def board_key(board, color):
+    """
+    Returns the Zobrist hash key of a position: the board and
+    the color of the player who is about to make a move.
+    Games update the key incrementally, this function is only used
+    to compute it from scratch.
+
+    >>> from chess.board import starting_board
+    >>> board_key(starting_board(), Color.White) == board_key(starting_board(), Color.White)
+    True
+
+    >>> board_key(starting_board(), Color.White) == board_key(starting_board(), Color.Black)
+    False
+    """
+    key = black_to_move_key if color == Color.Black else 0
+    for field_key, figure in board.items():
+        key ^= figure_key(field_key, figure)
+    return key
+
+
+def pawn_structure_key(board):
+    """
+    Returns the Zobrist hash key of the Pawns on the board.
+    It only changes when a Pawn moves, is captured or promoted,
+    so it identifies the Pawn structure of a position.
+    Games update the key incrementally, this function is only used
+    to compute it from scratch.
+
+    >>> from chess.board import starting_board
+    >>> board = starting_board()
+    >>> del board[(2,1)]
+    >>> pawn_structure_key(board) == pawn_structure_key(starting_board())
+    True
+    """
+    key = 0
+    for field_key, figure in board.items():
+        if figure.figure_type == FigureType.Pawn:
+            key ^= figure_key(field_key, figure)
+    return key
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()